@@ -5,6 +5,9 @@ set -e
 echo "Applying database migrations..."
 python manage.py migrate --noinput
 
+echo "Processing pending profile pictures..."
+python manage.py warm_profile_pictures
+
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
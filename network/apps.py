@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.conf import settings
+from PIL import Image
 
 
 class NetworkConfig(AppConfig):
     name = "network"
+
+    def ready(self):
+        Image.MAX_IMAGE_PIXELS = settings.MAX_IMAGE_PIXELS
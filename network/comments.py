@@ -7,7 +7,6 @@ from .models import Comment, Post
 from django.db import transaction
 from django.db.models import F
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
 
 from .utils import (
     get_body_content,
@@ -16,6 +15,7 @@ from .utils import (
     require_put_delete,
     require_get,
     InvalidRequestBodyError,
+    OrjsonResponse,
 )
 
 
@@ -29,17 +29,49 @@ def comments_view(request, post_id):
         post_id (int | str): The ID of the post whose comments are requested.
 
     Returns:
-        JsonResponse:
+        OrjsonResponse:
             - On success: JSON containing a list of serialized comments, status 200.
             - On failure (wrong method): JSON with error message, status 400.
     """
-    comments = Comment.objects.filter(post_id=post_id).order_by("-timestamp")
-    return JsonResponse(
-        {"comments": [comment.serialize(user=request.user) for comment in comments]},
+    user_cache = {}
+    return OrjsonResponse(
+        {
+            "comments": [
+                comment.serialize(user=request.user, user_cache=user_cache)
+                for comment in get_comments(post_id)
+            ]
+        },
+        status=200,
+    )
+
+
+@require_get
+async def comments_view_async(request, post_id):
+    """
+    Async variant of comments_view, routed when USE_ASYNC_VIEWS is enabled
+    and the app is served by an ASGI server.
+    """
+    user = await request.auser()
+    user_cache = {}
+    return OrjsonResponse(
+        {
+            "comments": [
+                comment.serialize(user=user, user_cache=user_cache)
+                async for comment in get_comments(post_id)
+            ]
+        },
         status=200,
     )
 
 
+def get_comments(post_id):
+    return (
+        Comment.objects.filter(post_id=post_id)
+        .select_related("user")
+        .order_by("-timestamp")
+    )
+
+
 @login_required
 @require_post
 def create_comment(request, post_id):
@@ -51,7 +83,7 @@ def create_comment(request, post_id):
         post_id (int | str): The ID of the post to comment on.
 
     Returns:
-        JsonResponse:
+        OrjsonResponse:
             - On success: JSON containing the serialized comment, updated comment count, status 201.
             - On failure:
                 - Missing or invalid content: JSON with error message, status 400.
@@ -62,22 +94,22 @@ def create_comment(request, post_id):
     try:
         content = get_body_content(request, "content")
     except InvalidRequestBodyError as error:
-        return JsonResponse({"error": str(error)}, status=400)
+        return OrjsonResponse({"error": str(error)}, status=400)
 
     is_valid, error = validate_content(content, 100)
     if not is_valid:
-        return JsonResponse({"error": error}, status=400)
+        return OrjsonResponse({"error": error}, status=400)
 
     try:
         post = Post.objects.get(id=post_id)
     except Post.DoesNotExist:
-        return JsonResponse({"error": "Post does not exist."}, status=400)
+        return OrjsonResponse({"error": "Post does not exist."}, status=400)
 
     comment = Comment(user=request.user, post=post, content=content)
 
     comment.save_comment()
 
-    return JsonResponse(
+    return OrjsonResponse(
         {
             "message": "Comment created.",
             "comment": comment.serialize(user=request.user),
@@ -98,7 +130,7 @@ def update_comment(request, comment_id):
         comment_id (int | str): The ID of the comment to update or delete.
 
     Returns:
-        JsonResponse:
+        OrjsonResponse:
             - On success:
                 - Edit action: JSON containing updated content, status 200.
                 - Delete action: JSON containing updated comment count, status 200.
@@ -110,22 +142,22 @@ def update_comment(request, comment_id):
             - Requires authentication (login_required).
     """
     try:
-        comment = Comment.objects.get(id=comment_id)
+        comment = Comment.objects.select_related("post").get(id=comment_id)
     except Comment.DoesNotExist:
-        return JsonResponse({"error": "Comment does not exist."}, status=400)
+        return OrjsonResponse({"error": "Comment does not exist."}, status=400)
 
     try:
         action = get_body_content(request, "action")
     except InvalidRequestBodyError as e:
-        return JsonResponse({"error": str(e)}, status=400)
+        return OrjsonResponse({"error": str(e)}, status=400)
 
     if action == "delete":
-        if comment.user != request.user:
-            return JsonResponse({"error": "Unauthorized."}, status=403)
+        if comment.user_id != request.user.id:
+            return OrjsonResponse({"error": "Unauthorized."}, status=403)
 
         comment.delete_comment()
 
-        return JsonResponse(
+        return OrjsonResponse(
             {"message": "Comment deleted.", "commentCount": comment.post.comment_count},
             status=200,
         )
@@ -134,17 +166,17 @@ def update_comment(request, comment_id):
         try:
             content = get_body_content(request, "content")
         except InvalidRequestBodyError as error:
-            return JsonResponse({"error": str(error)}, status=400)
+            return OrjsonResponse({"error": str(error)}, status=400)
 
         is_valid, error = validate_content(content, 100)
         if not is_valid:
-            return JsonResponse({"error": error}, status=400)
+            return OrjsonResponse({"error": error}, status=400)
 
         comment.content = content
         comment.save()
-        return JsonResponse(
+        return OrjsonResponse(
             {"message": "Comment edited.", "content": comment.content}, status=200
         )
 
     else:
-        return JsonResponse({"error": f"Invalid action: {action}"}, status=400)
+        return OrjsonResponse({"error": f"Invalid action: {action}"}, status=400)
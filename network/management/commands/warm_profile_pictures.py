@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from network.models import User, process_profile_picture
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate thumbnails for profile pictures still flagged as processing, "
+        "whose background processing failed or never ran."
+    )
+
+    def handle(self, *args, **options):
+        user_ids = list(
+            User.objects.filter(profile_picture_processing=True).values_list(
+                "pk", flat=True
+            )
+        )
+        warmed = sum(process_profile_picture(user_id) for user_id in user_ids)
+
+        self.stdout.write(f"Processed {warmed} of {len(user_ids)} profile pictures.")
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-15 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("network", "0006_alter_comment_id_alter_post_id_alter_user_id_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["user", "-timestamp", "-id"], name="post_user_cursor_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-15 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("network", "0007_post_post_user_cursor_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="profile_picture_processing",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
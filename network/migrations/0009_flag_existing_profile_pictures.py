@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def flag_existing_profile_pictures(apps, schema_editor):
+    # Thumbnails are no longer created on demand, queue pictures uploaded
+    # before that for the warm_profile_pictures command
+    User = apps.get_model("network", "User")
+    User.objects.exclude(profile_picture__isnull=True).exclude(
+        profile_picture=""
+    ).update(profile_picture_processing=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("network", "0008_user_profile_picture_processing"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            flag_existing_profile_pictures, migrations.RunPython.noop
+        ),
+    ]
@@ -1,17 +1,35 @@
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.storage import default_storage
 from django.core.validators import MinLengthValidator, EmailValidator, RegexValidator
 from django.contrib.auth.models import AbstractUser
 from django.dispatch import receiver
-from django.db import models, transaction
-from django.db.models import F, Index
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import Case, F, Index, When
 from django.db.models.functions import Lower
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_save, pre_save
 from django.templatetags.static import static
 from versatileimagefield.fields import VersatileImageField
+from versatileimagefield.image_warmer import VersatileImageFieldWarmer
 
-import os, uuid
+import logging, os, threading, uuid
+
+
+logger = logging.getLogger(__name__)
+
+
+def profile_cache_key(user_id):
+    return f"profile:{user_id}"
+
+
+def invalidate_profile_cache(*user_ids):
+    """
+    Drop cached profiles once the current transaction commits,
+    so a concurrent request cannot cache the pre-commit values again.
+    """
+    keys = [profile_cache_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
 
 
 def profile_picture_upload(instance, filename):
@@ -57,11 +75,31 @@ class User(AbstractUser):
     post_count = models.PositiveIntegerField(default=0, editable=False)
     followers_count = models.PositiveIntegerField(default=0, editable=False)
     following_count = models.PositiveIntegerField(default=0, editable=False)
+    profile_picture_processing = models.BooleanField(default=False, editable=False)
+
+    def save(self, **kwargs):
+        """
+        Full saves of an existing user leave profile_picture_processing alone,
+        a stale instance would otherwise write the flag back over the
+        background processing. A new picture sets it in
+        schedule_profile_picture_processing instead.
+        """
+        if kwargs.get("update_fields") is None and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name != "profile_picture_processing"
+            ]
+        super().save(**kwargs)
 
     def toggle_follow(self, target_user):
         """
         Toggle follow status for the target_user.
-        Handles both the ManyToMany relationship and the counter fields atomically.
+        Handles both the ManyToMany relationship and the counter fields atomically,
+        keeping the counters on both instances in sync without a reload.
 
         Returns:
             bool: True if now following, False if now unfollowed.
@@ -69,29 +107,41 @@ class User(AbstractUser):
         if self == target_user:
             return False
 
-        follow = target_user.followers.filter(id=self.id).exists()
+        follows = self.__class__.followers.through.objects
 
         with transaction.atomic():
+            # Unfollow if the relation existed, otherwise follow
+            deleted, _ = follows.filter(
+                from_user_id=target_user.id, to_user_id=self.id
+            ).delete()
+            follow = not deleted
+
             if follow:
-                # Unfollow
-                target_user.followers.remove(self)
-                self.__class__.objects.filter(id=self.id).update(
-                    following_count=F("following_count") - 1
-                )
-                self.__class__.objects.filter(id=target_user.id).update(
-                    followers_count=F("followers_count") - 1
-                )
-                return False
-            else:
-                # Follow
-                target_user.followers.add(self)
-                self.__class__.objects.filter(id=self.id).update(
-                    following_count=F("following_count") + 1
-                )
-                self.__class__.objects.filter(id=target_user.id).update(
-                    followers_count=F("followers_count") + 1
-                )
-                return True
+                try:
+                    with transaction.atomic():
+                        follows.create(from_user_id=target_user.id, to_user_id=self.id)
+                except IntegrityError:
+                    # A concurrent request already followed and counted it
+                    return True
+
+            delta = 1 if follow else -1
+            self.__class__.objects.filter(id__in=[self.id, target_user.id]).update(
+                following_count=Case(
+                    When(id=self.id, then=F("following_count") + delta),
+                    default=F("following_count"),
+                    output_field=models.PositiveIntegerField(),
+                ),
+                followers_count=Case(
+                    When(id=target_user.id, then=F("followers_count") + delta),
+                    default=F("followers_count"),
+                    output_field=models.PositiveIntegerField(),
+                ),
+            )
+            self.following_count += delta
+            target_user.followers_count += delta
+            invalidate_profile_cache(self.id, target_user.id)
+
+            return follow
 
     @property
     def profile_picture_url(self):
@@ -104,24 +154,47 @@ class User(AbstractUser):
     def get_profile_picture_url(self, thumbnail=False, size=PROFILE_THUMBNAIL_SIZE):
         """
         Handle the profile picture or thumbnail URL.
-        Checks storage existence to avoid broken links.
+        Trusts the stored picture name instead of checking storage existence,
+        a missing file is left to the media server's 404.
+        While a new upload is being processed, the thumbnail falls back to
+        the original picture.
+        Resolved URLs are memoized on the instance, keyed by picture name.
 
         - thumbnail: if True, return the thumbnail URL
         - size: size string for thumbnail
         """
-        if self.profile_picture and default_storage.exists(self.profile_picture.name):
-            if thumbnail and default_storage.exists(
-                self.profile_picture.thumbnail[size].name
-            ):
-                return self.profile_picture.thumbnail[size].url
-            return self.profile_picture.url
-        return ""
+        urls = self.__dict__.setdefault("_profile_picture_urls", {})
+        key = (
+            self.profile_picture.name,
+            self.profile_picture_processing,
+            thumbnail,
+            size,
+        )
+        if key not in urls:
+            urls[key] = self._resolve_profile_picture_url(thumbnail, size)
+        return urls[key]
+
+    def _resolve_profile_picture_url(self, thumbnail, size):
+        if not self.profile_picture:
+            return ""
+        if thumbnail and not self.profile_picture_processing:
+            return self.profile_picture.thumbnail[size].url
+        return self.profile_picture.url
+
+    def discard_unsaved_picture(self):
+        """
+        Remove a newly uploaded picture whose save was rolled back,
+        the file is written to storage before the row is.
+        """
+        if getattr(self, "_profile_picture_changed", False):
+            self._profile_picture_changed = False
+            delete_picture_files(self.profile_picture)
 
     def clean(self):
         """
-        Custom validation for:
-        - Case-insensitive uniqueness for username and email
-        - Profile picture
+        Custom validation for the profile picture.
+        Case-insensitive uniqueness for username and email is enforced by the
+        database constraints, see utils.unique_violation_message.
         """
         super().clean()
 
@@ -132,16 +205,6 @@ class User(AbstractUser):
             if not valid:
                 raise ValidationError({"profile_picture": message})
 
-        # Just to trown a user message
-        if (
-            User.objects.exclude(pk=self.pk)
-            .filter(username__iexact=self.username)
-            .exists()
-        ):
-            raise ValidationError({"username": "Username already in use."})
-        if User.objects.exclude(pk=self.pk).filter(email__iexact=self.email).exists():
-            raise ValidationError({"email": "Email already in use."})
-
     class Meta(AbstractUser.Meta):
         """
         Enforces case-insensitive uniqueness for username and email on Unix-based PostgreSQL servers.
@@ -168,21 +231,130 @@ def delete_previous_picture(sender, instance, **kwargs):
     """
     Signal to delete the previous profile picture from storage
     when the user uploads a new one, prevent orphan files.
+    Flags a new picture as processing until its thumbnail is generated.
     """
     try:
         old_instance = User.objects.get(pk=instance.pk)
     except User.DoesNotExist:
-        return
+        old_instance = None
 
-    old_picture = old_instance.profile_picture
+    old_picture = old_instance.profile_picture if old_instance else None
     new_picture = instance.profile_picture
+    instance._profile_picture_changed = bool(new_picture) and old_picture != new_picture
+    if instance._profile_picture_changed:
+        instance.profile_picture_processing = True
+
+    if not old_instance:
+        return
 
     if old_picture and old_picture != new_picture:
+        # Only drop the old file once the new picture is committed, a rolled
+        # back save discards this callback and keeps it. old_picture belongs to
+        # the freshly loaded row, so it keeps the old name and storage.
+        transaction.on_commit(lambda: delete_picture_files(old_picture))
+
+
+def delete_picture_files(picture):
+    """
+    Delete a profile picture and its generated images from storage.
+    """
+    try:
+        picture.delete_all_created_images()
+        picture.delete(save=False)
+    except PermissionError:
+        pass
+
+
+@receiver(post_save, sender=User)
+def invalidate_saved_profile(sender, instance, **kwargs):
+    """
+    Signal to drop the cached profile whenever the user is saved.
+    """
+    invalidate_profile_cache(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def schedule_profile_picture_processing(sender, instance, **kwargs):
+    """
+    Signal to process a new profile picture once the upload is committed,
+    off the request thread, so requests only build URLs.
+    """
+    if not getattr(instance, "_profile_picture_changed", False):
+        return
+
+    instance._profile_picture_changed = False
+    user_id = instance.pk
+    if not kwargs.get("created"):
+        User.objects.filter(pk=user_id).update(profile_picture_processing=True)
+    transaction.on_commit(
+        lambda: run_in_background(process_profile_picture, user_id)
+    )
+
+
+def process_profile_picture(user_id):
+    """
+    Generate the profile thumbnail for a new upload and clear the
+    processing flag, so the thumbnail URL is served from then on.
+    A failed thumbnail keeps the flag set, the original picture is served
+    until the warm_profile_pictures command retries it.
+
+    Returns:
+        bool: True if the flag was cleared.
+    """
+    picture = (
+        User.objects.filter(pk=user_id)
+        .values_list("profile_picture", flat=True)
+        .first()
+    )
+    if not picture:
+        User.objects.filter(pk=user_id).update(profile_picture_processing=False)
+        return True
+
+    failed = [picture]
+    try:
+        _, failed = VersatileImageFieldWarmer(
+            # Only the picture that was read, a newer upload is processed on its own
+            instance_or_queryset=User.objects.filter(pk=user_id, profile_picture=picture),
+            rendition_key_set=[
+                ("thumbnail", f"thumbnail__{User.PROFILE_THUMBNAIL_SIZE}"),
+            ],
+            image_attr="profile_picture",
+        ).warm()
+    finally:
+        if failed:
+            logger.error("Profile thumbnail generation failed for user %s", user_id)
+        else:
+            User.objects.filter(pk=user_id, profile_picture=picture).update(
+                profile_picture_processing=False
+            )
+    return not failed
+
+
+def run_in_background(func, *args):
+    """
+    Run func in a daemon thread, closing its database connections when done.
+    """
+
+    def target():
         try:
-            old_picture.delete_all_created_images()
-            old_picture.delete(save=False)
-        except PermissionError:
-            pass
+            func(*args)
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=target, daemon=True).start()
+
+
+def author_thumbnail_url(user, user_cache=None):
+    """
+    Return the user's profile thumbnail URL.
+    With a user_cache dict, the URL is memoized by user id so authors
+    repeated across a page resolve it only once.
+    """
+    if user_cache is None:
+        return user.profile_thumbnail_url
+    if user.id not in user_cache:
+        user_cache[user.id] = user.profile_thumbnail_url
+    return user_cache[user.id]
 
 
 class Post(models.Model):
@@ -196,20 +368,17 @@ class Post(models.Model):
     comment_count = models.PositiveIntegerField(default=0, editable=False)
 
     def save_post(self):
-        user = self.user
         with transaction.atomic():
             self.save()
-            user.__class__.objects.filter(id=user.id).update(
-                post_count=F("post_count") + 1
-            )
+            User.objects.filter(id=self.user_id).update(post_count=F("post_count") + 1)
+            invalidate_profile_cache(self.user_id)
 
     def delete_post(self):
-        user = self.user
+        user_id = self.user_id
         with transaction.atomic():
             self.delete()
-            user.__class__.objects.filter(id=user.id).update(
-                post_count=F("post_count") - 1
-            )
+            User.objects.filter(id=user_id).update(post_count=F("post_count") - 1)
+            invalidate_profile_cache(user_id)
 
     def like_post(self, user):
         """
@@ -220,7 +389,9 @@ class Post(models.Model):
             bool: True if the post is liked, False if the post id desliked
         """
         with transaction.atomic():
-            if self.likes.filter(id=user.id).exists():
+            if self.__class__.likes.through.objects.filter(
+                post_id=self.id, user_id=user.id
+            ).exists():
                 # Deslike
                 self.likes.remove(user)
                 self.__class__.objects.filter(id=self.id).update(
@@ -235,7 +406,8 @@ class Post(models.Model):
                 )
                 liked = True
 
-            self.refresh_from_db()
+            # Mirror the F() update locally instead of reloading the row
+            self.like_count += 1 if liked else -1
 
             return liked
 
@@ -249,15 +421,20 @@ class Post(models.Model):
                 user.pk == self.user_id if user and user.is_authenticated else False
             ),
             "content": self.content,
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": self.timestamp,
             "like_count": self.like_count,
             "comment_count": self.comment_count,
-            "liked": bool(getattr(self, "_liked_by_user", [])),
+            "liked": getattr(self, "_liked_by_user", False),
         }
 
     class Meta:
         ordering = ["-timestamp", "-id"]
-        indexes = [models.Index(fields=["-timestamp", "-id"], name="post_cursor_idx")]
+        indexes = [
+            models.Index(fields=["-timestamp", "-id"], name="post_cursor_idx"),
+            models.Index(
+                fields=["user", "-timestamp", "-id"], name="post_user_cursor_idx"
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -273,27 +450,27 @@ class Comment(models.Model):
     def save_comment(self):
         with transaction.atomic():
             self.save()
-            self.post.__class__.objects.filter(id=self.post.id).update(
+            Post.objects.filter(id=self.post_id).update(
                 comment_count=F("comment_count") + 1
             )
-            self.post.refresh_from_db(fields=["comment_count"])
+            self.post.comment_count = (self.post.comment_count or 0) + 1
 
     def delete_comment(self):
         with transaction.atomic():
             post = self.post
             self.delete()
-            post.__class__.objects.filter(id=post.id).update(
+            Post.objects.filter(id=post.id).update(
                 comment_count=F("comment_count") - 1
             )
-            post.refresh_from_db(fields=["comment_count"])
+            post.comment_count = max((post.comment_count or 0) - 1, 0)
 
-    def serialize(self, user=None):
+    def serialize(self, user=None, user_cache=None):
         return {
             "id": self.id,
             "user_id": self.user.id,
             "user": self.user.username,
             "user_is_author": user.is_authenticated and user == self.user,
-            "profile_picture": self.user.profile_thumbnail_url,
+            "profile_picture": author_thumbnail_url(self.user, user_cache),
             "content": self.content,
             "timestamp": self.timestamp,
         }
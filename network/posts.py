@@ -3,25 +3,37 @@ posts.py
 Views and helper functions for posts.
 """
 
-from django.http import JsonResponse
+from django.http import HttpResponse
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
-from django.db.models import Prefetch, F, Q
+from django.db.models import Exists, F, OuterRef, Q, Value
 from django.utils.dateparse import parse_datetime
 from .models import Post
 
 from .utils import (
     get_body_content,
-    get_user,
     validate_content,
     require_post,
     require_put_delete,
     require_get,
     InvalidRequestBodyError,
+    OrjsonResponse,
 )
 
 POST_LIMIT = 10
+PAGE_FIELDS = (
+    "id",
+    "content",
+    "timestamp",
+    "like_count",
+    "comment_count",
+    "user_id",
+    "user__username",
+    "user__profile_picture",
+    "user__profile_picture_processing",
+    "_liked_by_user",
+)
 
 User = get_user_model()
 
@@ -36,47 +48,81 @@ def posts_view(request, filter):
         filter (str): Filter type.
 
     Returns:
-        JsonResponse:
+        OrjsonResponse:
             - JSON with serialized posts, pagination info, and like status, if authenticated.
             - JSON with error message and status if filter fails or user unauthenticated.
     """
     error, posts_qs, status = get_posts(request, filter)
     if error:
-        return JsonResponse({"error": error}, status=status)
+        return OrjsonResponse({"error": error}, status=status)
 
     _, has_next, return_posts = paginate_posts(posts_qs)
 
     if not return_posts:
-        return JsonResponse({"posts": [], "hasNext": False}, status=200)
+        if filter == "profile" and not profile_owner(request).exists():
+            return OrjsonResponse({"error": "User not found."}, status=404)
+        return OrjsonResponse({"posts": [], "hasNext": False}, status=200)
+
+    return OrjsonResponse(
+        {
+            "posts": serialize_page(return_posts, request.user),
+            "hasNext": has_next,
+        },
+        status=200,
+    )
+
+
+@require_get
+async def posts_view_async(request, filter):
+    """
+    Async variant of posts_view, routed when USE_ASYNC_VIEWS is enabled
+    and the app is served by an ASGI server.
+    """
+    user = await request.auser()
+    error, posts_qs, status = get_posts(request, filter, user)
+    if error:
+        return OrjsonResponse({"error": error}, status=status)
+
+    _, has_next, return_posts = await apaginate_posts(posts_qs)
+
+    if not return_posts:
+        if filter == "profile" and not await profile_owner(request).aexists():
+            return OrjsonResponse({"error": "User not found."}, status=404)
+        return OrjsonResponse({"posts": [], "hasNext": False}, status=200)
 
-    return JsonResponse(
+    return OrjsonResponse(
         {
-            "posts": [post.serialize(request.user) for post in return_posts],
+            "posts": serialize_page(return_posts, user),
             "hasNext": has_next,
         },
         status=200,
     )
 
 
-def get_posts(request, filter):
+def get_posts(request, filter, user=None):
     """
     Retrieve posts.
+    Only builds the queryset, so the sync and async views share it. The profile
+    filter's owner is looked up by the views when the page comes back empty.
 
     Args:
         request (HttpRequest): Django request object, may contain 'user_id' in GET for 'profile' filter.
         filter (str): Filter type.
+        user (User, optional): The requesting user, defaults to request.user.
 
     Returns:
         tuple: (error (str|None), posts (QuerySet), status (int))
     """
     error = None
     status = 200
+    user = request.user if user is None else user
     posts = Post.objects.all().select_related("user")
 
     match filter:
         case "following":
-            if request.user.is_authenticated:
-                posts = posts.filter(user__followers=request.user)
+            if user.is_authenticated:
+                # The followers through table is unique per pair, one row per post
+                posts = posts.filter(user__followers=user)
             else:
                 error = "User not authenticated."
                 status = 401
@@ -85,9 +131,9 @@ def get_posts(request, filter):
             pass
 
         case "profile":
-            user = get_user(request.GET.get("user_id"))
-            if user:
-                posts = posts.filter(user=user)
+            user_id = get_profile_id(request)
+            if user_id is not None:
+                posts = posts.filter(user_id=user_id)
             else:
                 error = "User not found."
                 status = 404
@@ -96,18 +142,32 @@ def get_posts(request, filter):
             error = "Filter not found."
             status = 404
 
-    if request.user.is_authenticated and status == 200:
-        posts = posts.prefetch_related(
-            Prefetch(
-                "likes",
-                queryset=User.objects.filter(id=request.user.id),
-                to_attr="_liked_by_user",
-            )
+    if user.is_authenticated:
+        liked_by_user = Exists(
+            Post.likes.through.objects.filter(post_id=OuterRef("pk"), user_id=user.id)
         )
+    else:
+        liked_by_user = Value(False)
+    posts = posts.annotate(_liked_by_user=liked_by_user)
 
     return error, posts if status == 200 else Post.objects.none(), status
 
 
+def get_profile_id(request):
+    try:
+        return int(request.GET.get("user_id"))
+    except (ValueError, TypeError):
+        return None
+
+
+def profile_owner(request):
+    """
+    The profile filter's owner, only checked for an empty page,
+    a page of posts already proves the user exists.
+    """
+    return User.objects.filter(id=get_profile_id(request))
+
+
 @login_required
 @require_put_delete
 def update_post(request, post_id):
@@ -119,42 +179,42 @@ def update_post(request, post_id):
         post_id (int): ID of the post to update.
 
     Returns:
-        JsonResponse:
+        OrjsonResponse:
             - Success or error message depending on action result.
             - HTTP 400 if unauthorized, missing parameters, or invalid action.
     """
     try:
         post = Post.objects.get(id=post_id)
     except Post.DoesNotExist:
-        return JsonResponse({"error": "Post does not exist."}, status=400)
+        return OrjsonResponse({"error": "Post does not exist."}, status=400)
 
     try:
         action = get_body_content(request, "action")
     except InvalidRequestBodyError as e:
-        return JsonResponse({"error": str(e)}, status=400)
+        return OrjsonResponse({"error": str(e)}, status=400)
 
     if action == "like":
         liked = post.like_post(request.user)
-        return JsonResponse({"liked": liked, "like_count": post.like_count}, status=200)
+        return OrjsonResponse({"liked": liked, "like_count": post.like_count}, status=200)
 
     elif action == "edit":
         edited, message, status = edit_post(request, post)
         if not edited:
-            return JsonResponse({"error": message}, status=status)
-        return JsonResponse(
+            return OrjsonResponse({"error": message}, status=status)
+        return OrjsonResponse(
             {"message": message, "content": post.content}, status=status
         )
 
     elif action == "delete":
-        if post.user != request.user:
-            return JsonResponse({"error": "Unauthorized."}, status=403)
+        if post.user_id != request.user.id:
+            return OrjsonResponse({"error": "Unauthorized."}, status=403)
 
         post.delete_post()
 
-        return JsonResponse({"message": "Post deleted."}, status=200)
+        return OrjsonResponse({"message": "Post deleted."}, status=200)
 
     else:
-        return JsonResponse({"error": f"Invalid action: {action}"}, status=400)
+        return OrjsonResponse({"error": f"Invalid action: {action}"}, status=400)
 
 
 def edit_post(request, post):
@@ -171,7 +231,7 @@ def edit_post(request, post):
             - message: Description of result.
             - status: Status code.
     """
-    if post.user != request.user:
+    if post.user_id != request.user.id:
         return False, "Unauthorized.", 403
 
     try:
@@ -200,18 +260,18 @@ def create_post(request):
         request (HttpRequest): Must be POST request with JSON body containing 'content'.
 
     Returns:
-        JsonResponse:
+        OrjsonResponse:
             - On success: message and post ID, status 201.
             - On failure: error message, status 400.
     """
     try:
         content = get_body_content(request, "content")
     except InvalidRequestBodyError as error:
-        return JsonResponse({"error": str(error)}, status=400)
+        return OrjsonResponse({"error": str(error)}, status=400)
 
     is_valid, error = validate_content(content)
     if not is_valid:
-        return JsonResponse({"error": error}, status=400)
+        return OrjsonResponse({"error": error}, status=400)
 
     post = Post(user=request.user, content=content)
 
@@ -220,7 +280,7 @@ def create_post(request):
     data = post.serialize(request.user)
     data["liked"] = False
 
-    return JsonResponse({"postData": data}, status=201)
+    return OrjsonResponse({"postData": data}, status=201)
 
 
 @require_get
@@ -230,43 +290,139 @@ def get_more_posts(request, filter):
 
     error, posts_qs, status = get_posts(request, filter)
     if error:
-        return JsonResponse({"error": error}, status=status)
+        return OrjsonResponse({"error": error}, status=status)
 
     error, has_next, return_posts = paginate_posts(posts_qs, timestamp, post_id)
     if error:
-        return JsonResponse({"error": error}, status=400)
+        return OrjsonResponse({"error": error}, status=400)
 
     if not return_posts:
-        return JsonResponse({"posts": [], "hasNext": False}, status=204)
+        if filter == "profile" and not profile_owner(request).exists():
+            return OrjsonResponse({"error": "User not found."}, status=404)
+        return HttpResponse(status=204)
 
-    return JsonResponse(
+    return OrjsonResponse(
         {
-            "posts": [post.serialize(request.user) for post in return_posts],
+            "posts": serialize_page(return_posts, request.user),
             "hasNext": has_next,
         },
         status=200,
     )
 
 
-def paginate_posts(posts_qs, timestamp=None, post_id=None):
-    posts = posts_qs.order_by("-timestamp", "-id")
+@require_get
+async def get_more_posts_async(request, filter):
+    """
+    Async variant of get_more_posts, routed when USE_ASYNC_VIEWS is enabled
+    and the app is served by an ASGI server.
+    """
+    timestamp = request.GET.get("timestamp")
+    post_id = request.GET.get("post_id")
+
+    user = await request.auser()
+    error, posts_qs, status = get_posts(request, filter, user)
+    if error:
+        return OrjsonResponse({"error": error}, status=status)
+
+    error, has_next, return_posts = await apaginate_posts(posts_qs, timestamp, post_id)
+    if error:
+        return OrjsonResponse({"error": error}, status=400)
+
+    if not return_posts:
+        if filter == "profile" and not await profile_owner(request).aexists():
+            return OrjsonResponse({"error": "User not found."}, status=404)
+        return HttpResponse(status=204)
+
+    return OrjsonResponse(
+        {
+            "posts": serialize_page(return_posts, user),
+            "hasNext": has_next,
+        },
+        status=200,
+    )
+
+
+def get_page(posts_qs, timestamp=None, post_id=None):
+    """
+    Build the query for the page after the (timestamp, post_id) cursor,
+    fetching one extra row to tell whether another page follows.
+
+    Returns:
+        tuple: (error (str|None), page (QuerySet|None))
+    """
+    # Ordering (-timestamp, -id) comes from Post.Meta and matches post_cursor_idx
+    posts = posts_qs
 
     if timestamp and post_id:
         try:
             timestamp = parse_datetime(timestamp)
             post_id = int(post_id)
-            posts = posts.filter(
-                Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=post_id)
-            )
-        except:
-            return {
-                "error": "Error parsing post data.",
-                "has_next": None,
-                "return_posts": None,
-            }
-
-    fetched = list(posts[: POST_LIMIT + 1])
-    has_next = len(fetched) > POST_LIMIT
-    return_posts = fetched[:POST_LIMIT]
-
-    return None, has_next, return_posts
+        except (ValueError, TypeError):
+            timestamp = None
+
+        if timestamp is None:
+            return "Error parsing post data.", None
+
+        posts = posts.filter(
+            Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=post_id)
+        )
+
+    return None, posts.values(*PAGE_FIELDS)[: POST_LIMIT + 1]
+
+
+def paginate_posts(posts_qs, timestamp=None, post_id=None):
+    error, page = get_page(posts_qs, timestamp, post_id)
+    if error:
+        return error, None, None
+
+    fetched = list(page)
+    return None, len(fetched) > POST_LIMIT, fetched[:POST_LIMIT]
+
+
+async def apaginate_posts(posts_qs, timestamp=None, post_id=None):
+    error, page = get_page(posts_qs, timestamp, post_id)
+    if error:
+        return error, None, None
+
+    fetched = [post async for post in page]
+    return None, len(fetched) > POST_LIMIT, fetched[:POST_LIMIT]
+
+
+def serialize_page(posts, user=None):
+    """
+    Serialize a page of posts fetched as PAGE_FIELDS rows.
+    Builds the same payload as Post.serialize without hydrating model instances.
+
+    Args:
+        posts (list[dict]): Rows returned by paginate_posts or apaginate_posts.
+        user (User, optional): The requesting user.
+
+    Returns:
+        list[dict]: Serialized posts.
+    """
+    user_id = user.pk if user and user.is_authenticated else None
+
+    # Resolve each author's thumbnail once per page
+    thumbnails = {}
+    for post in posts:
+        if post["user_id"] not in thumbnails:
+            thumbnails[post["user_id"]] = User(
+                profile_picture=post["user__profile_picture"],
+                profile_picture_processing=post["user__profile_picture_processing"],
+            ).profile_thumbnail_url
+
+    return [
+        {
+            "id": post["id"],
+            "user": post["user__username"],
+            "profile_picture": thumbnails[post["user_id"]],
+            "user_id": post["user_id"],
+            "user_is_author": post["user_id"] == user_id,
+            "content": post["content"],
+            "timestamp": post["timestamp"],
+            "like_count": post["like_count"],
+            "comment_count": post["comment_count"],
+            "liked": post["_liked_by_user"],
+        }
+        for post in posts
+    ]
@@ -3,13 +3,23 @@ profiles.py
 Views for handling user profile retrieval and actions.
 """
 
-from django.http import JsonResponse
-from django.db import transaction
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.db.models import F
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
 
-from .utils import get_user, require_post, require_put, require_get
+from .models import User, profile_cache_key
+from .utils import (
+    get_user,
+    require_post,
+    require_put,
+    require_get,
+    unique_violation_message,
+    OrjsonResponse,
+)
+
+PROFILE_CACHE_TIMEOUT = 30
 
 
 @require_get
@@ -22,32 +32,73 @@ def profile_view(request, id):
         id (int | str): The ID of the user whose profile is requested.
 
     Returns:
-        JsonResponse:
+        OrjsonResponse:
             - On success: JSON containing user data.
             - On failure: JSON with error message and HTTP status.
     """
-    user = get_user(id)
-    if not user:
-        return JsonResponse({"error": "User not found."}, status=404)
+    key = profile_cache_key(id)
+    profile = cache.get(key)
+    if profile is None:
+        user = User.objects.filter(id=id).first()
+        if not user:
+            return OrjsonResponse({"error": "User not found."}, status=404)
 
-    is_following = False
-    if request.user.is_authenticated:
-        is_following = user.followers.filter(id=request.user.id).exists()
+        profile = serialize_profile(user)
+        cache.set(key, profile, PROFILE_CACHE_TIMEOUT)
 
-    return JsonResponse(
-        {
-            "username": user.username,
-            "id": user.id,
-            "profile_picture": (
-                user.profile_picture_url if user.profile_picture else None
-            ),
-            "followers": user.followers_count,
-            "following": user.following_count,
-            "follow": is_following,
-            "post_count": user.post_count,
-        },
-        status=200,
-    )
+    follow = request.user.is_authenticated and follows(id, request.user).exists()
+
+    return OrjsonResponse({**profile, "follow": follow}, status=200)
+
+
+@require_get
+async def profile_view_async(request, id):
+    """
+    Async variant of profile_view, routed when USE_ASYNC_VIEWS is enabled
+    and the app is served by an ASGI server.
+    """
+    key = profile_cache_key(id)
+    profile = await cache.aget(key)
+    if profile is None:
+        user = await User.objects.filter(id=id).afirst()
+        if not user:
+            return OrjsonResponse({"error": "User not found."}, status=404)
+
+        profile = serialize_profile(user)
+        await cache.aset(key, profile, PROFILE_CACHE_TIMEOUT)
+
+    viewer = await request.auser()
+    follow = viewer.is_authenticated and await follows(id, viewer).aexists()
+
+    return OrjsonResponse({**profile, "follow": follow}, status=200)
+
+
+def follows(id, viewer):
+    """
+    Query the followers through table for the viewer following the user.
+
+    Args:
+        id (int | str): The ID of the followed user.
+        viewer (User): The requesting user.
+
+    Returns:
+        QuerySet: Matching follow relations.
+    """
+    return User.followers.through.objects.filter(from_user_id=id, to_user_id=viewer.id)
+
+
+def serialize_profile(user):
+    """
+    Serialize the viewer-independent profile data, safe to cache.
+    """
+    return {
+        "username": user.username,
+        "id": user.id,
+        "profile_picture": (user.profile_picture_url if user.profile_picture else None),
+        "followers": user.followers_count,
+        "following": user.following_count,
+        "post_count": user.post_count,
+    }
 
 
 @login_required
@@ -61,7 +112,7 @@ def edit_profile(request):
         request (HttpRequest): Django request object containing the current user and POST data.
 
     Returns:
-        JsonResponse:
+        OrjsonResponse:
             - On success: {"success": True}.
             - On failure: JSON with error message and appropriate HTTP status.
     """
@@ -78,15 +129,19 @@ def edit_profile(request):
     if email:
         user.email = email.strip().lower()
 
-    # Validate data
+    # Validate data, uniqueness is left to the database constraints
     try:
-        user.full_clean()
-        user.save()
+        user.full_clean(validate_unique=False, validate_constraints=False)
+        with transaction.atomic():
+            user.save()
     except ValidationError as error:
         field, messages = next(iter(error.message_dict.items()))
-        return JsonResponse({"error": messages[0]}, status=409)
+        return OrjsonResponse({"error": messages[0]}, status=409)
+    except IntegrityError as error:
+        user.discard_unsaved_picture()
+        return OrjsonResponse({"error": unique_violation_message(error)}, status=409)
 
-    return JsonResponse(
+    return OrjsonResponse(
         {
             "success": True,
             "profile_picture": user.profile_thumbnail_url if picture else None,
@@ -105,15 +160,15 @@ def get_email(request, user_id):
         user_id (int | str): ID of the user whose email is requested.
 
     Returns:
-        JsonResponse:
+        OrjsonResponse:
             - On success: JSON containing email.
             - On failure: JSON with error message and HTTP status.
     """
     user = request.user
-    target_user = get_user(user_id)
+    target_user = get_user(user_id, "id")
     if user != target_user:
-        return JsonResponse({"error": "Unauthorized."}, status=403)
-    return JsonResponse({"email": user.email}, status=200)
+        return OrjsonResponse({"error": "Unauthorized."}, status=403)
+    return OrjsonResponse({"email": user.email}, status=200)
 
 
 @login_required
@@ -127,23 +182,21 @@ def follow_view(request, id):
         id (int | str): The ID of the target user to follow or unfollow.
 
     Returns:
-        JsonResponse:
+        OrjsonResponse:
             - On success: JSON containing current follow status and followers count.
             - On failure: JSON with error message and appropriate HTTP status.
     """
-    target_user = get_user(id)
+    target_user = get_user(id, "followers_count")
     if not target_user:
-        return JsonResponse({"error": "User not found."}, status=404)
+        return OrjsonResponse({"error": "User not found."}, status=404)
 
     user = request.user
 
     if target_user == user:  # pragma: no cover
-        return JsonResponse({"error": "You cannot follow yourself."}, status=400)
+        return OrjsonResponse({"error": "You cannot follow yourself."}, status=400)
 
     follow = user.toggle_follow(target_user)
 
-    target_user.refresh_from_db()
-
-    return JsonResponse(
+    return OrjsonResponse(
         {"follow": follow, "followers_count": target_user.followers_count}, status=200
     )
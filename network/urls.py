@@ -15,13 +15,41 @@ urlpatterns = [
     path(
         "post/comment/<int:comment_id>", comments.update_comment, name="update_comment"
     ),
-    path("post/<int:post_id>/comments", comments.comments_view, name="comments"),
-    path("posts/<str:filter>", posts.posts_view, name="posts"),
-    path("profile/<int:id>", profiles.profile_view, name="profile"),
+    path(
+        "post/<int:post_id>/comments",
+        (
+            comments.comments_view_async
+            if settings.USE_ASYNC_VIEWS
+            else comments.comments_view
+        ),
+        name="comments",
+    ),
+    path(
+        "posts/<str:filter>",
+        posts.posts_view_async if settings.USE_ASYNC_VIEWS else posts.posts_view,
+        name="posts",
+    ),
+    path(
+        "profile/<int:id>",
+        (
+            profiles.profile_view_async
+            if settings.USE_ASYNC_VIEWS
+            else profiles.profile_view
+        ),
+        name="profile",
+    ),
     path("profile/edit", profiles.edit_profile, name="edit_profile"),
     path("follow/<int:id>", profiles.follow_view, name="follow"),
     path("user/<int:user_id>/email", profiles.get_email, name="get_email"),
-    path("posts/<str:filter>/more", posts.get_more_posts, name="get_more_posts"),
+    path(
+        "posts/<str:filter>/more",
+        (
+            posts.get_more_posts_async
+            if settings.USE_ASYNC_VIEWS
+            else posts.get_more_posts
+        ),
+        name="get_more_posts",
+    ),
 ]
 
 if settings.DEBUG:  # pragma: no cover
@@ -3,15 +3,34 @@ utils.py
 Utility functions used across multiple view modules.
 """
 
+from asgiref.sync import iscoroutinefunction
+from functools import lru_cache, wraps
 from PIL import Image
 
 from django.conf import settings
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotAllowed
 from django.templatetags.static import static
-import json
+import orjson, os
 
 from .models import User
 
+# JPEG and PNG file signatures
+IMAGE_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n")
+MAX_IMAGE_SIZE = 5 * 1024 * 1024
+
+# Unique constraints on User, by PostgreSQL constraint or SQLite index/column name
+UNIQUE_VIOLATION_MESSAGES = {
+    "user_username_ci_unique": "Username already in use.",
+    "network_user_username_key": "Username already in use.",
+    "network_user.username": "Username already in use.",
+    "user_email_ci_unique": "Email already in use.",
+    "network_user_email_key": "Email already in use.",
+    "network_user.email": "Email already in use.",
+}
+
+# Sentinel for absent body fields, None is a valid JSON value
+MISSING = object()
+
 
 def get_body_content(request, content_type=None):
     """
@@ -42,36 +61,56 @@ def get_body_content(request, content_type=None):
     Notes:
         - Non-string values (lists, dicts, booleans, numbers) are returned unchanged.
         - Empty request bodies return an empty dict.
+        - The body is parsed and trimmed once, then cached on the request.
     """
-    try:
-        data = json.loads(request.body) if request.body else {}
-        if content_type:
-            if content_type not in data:
-                raise InvalidRequestBodyError(f"Missing required field: {content_type}")
+    data = getattr(request, "_parsed_body", None)
+    if data is None:
+        try:
+            data = orjson.loads(request.body) if request.body else {}
+        except orjson.JSONDecodeError:
+            raise InvalidRequestBodyError("Invalid JSON in request body")
 
-            value = data[content_type]
+        if not isinstance(data, dict):
+            raise InvalidRequestBodyError("Invalid JSON in request body")
 
-            if isinstance(value, str):
-                value = value.strip()
+        data = {
+            key: value.strip() if type(value) is str else value
+            for key, value in data.items()
+        }
+        request._parsed_body = data
 
-            return value
+    if content_type:
+        value = data.get(content_type, MISSING)
+        if value is MISSING:
+            raise InvalidRequestBodyError(f"Missing required field: {content_type}")
 
-        for key, value in data.items():
-            if isinstance(value, str):
-                data[key] = value.strip()
+        return value
 
-        return data
-    except json.JSONDecodeError:
-        raise InvalidRequestBodyError("Invalid JSON in request body")
+    return data
 
 
-def get_user(user_id):
+def get_form_field(request, name):
+    """
+    Return a trimmed form field, an empty string when it is missing.
+
+    Args:
+        request (HttpRequest): The incoming Django request.
+        name (str): Name of the POST field.
+
+    Returns:
+        str: The trimmed value.
+    """
+    return (request.POST.get(name) or "").strip()
+
+
+def get_user(user_id, *fields):
     """
     Retrieve a User instance by ID.
 
     Args:
         user_id (int | str): ID of the user to retrieve. Accepts string
         representations of integers for convenience.
+        *fields (str): Optional columns to load, the rest is deferred.
 
     Returns:
         User | None:
@@ -79,16 +118,22 @@ def get_user(user_id):
             - None if the ID is invalid or the user does not exist.
     """
     try:
-        user = User.objects.get(id=int(user_id))
-    except (User.DoesNotExist, ValueError, TypeError):
+        user_id = int(user_id)
+    except (ValueError, TypeError):
         return None
 
-    return user
+    users = User.objects.filter(id=user_id)
+    if fields:
+        users = users.only(*fields)
+
+    return users.first()
 
 
 def validate_image(image):
     """
     Validate an uploaded image file.
+    The size is checked first, then the format is detected from the file
+    signature, the image is not decoded.
 
     Args:
         image (File): Uploaded image file.
@@ -98,25 +143,49 @@ def validate_image(image):
             - True, None if the image is valid.
             - False, error message string if invalid.
     """
-    try:
-        img = Image.open(image)
-        img.verify()
-        image.seek(0)
-    except (IOError, SyntaxError):
-        return False, "Invalid image file."
+    if get_file_size(image) > MAX_IMAGE_SIZE:
+        return False, "Image too big."
 
-    if img.format.lower() not in ["jpeg", "png"]:
-        return False, f"Unsupported image format: {img.format}"
+    head = image.read(16)
+    image.seek(0)
 
+    if not head.startswith(IMAGE_SIGNATURES):
+        # Only identify the rejected format for the error message
+        try:
+            image_format = Image.open(image).format
+        except (IOError, SyntaxError, Image.DecompressionBombError):
+            return False, "Invalid image file."
+        finally:
+            image.seek(0)
+
+        return False, f"Unsupported image format: {image_format}"
+
+    return True, None
+
+
+def get_file_size(file):
+    """
+    Return the size of a file in bytes without reading its content.
+
+    Args:
+        file (File | BytesIO): Uploaded file or in-memory buffer.
+
+    Returns:
+        int: Size in bytes.
+    """
     try:
-        image_size = image.size / (1024 * 1024)
+        return file.size
     except AttributeError:
-        image_size = len(image.getvalue()) / (1024 * 1024)
+        pass
 
-    if image_size > 5:
-        return False, "Image too big."
+    if hasattr(file, "getbuffer"):
+        with file.getbuffer() as buffer:
+            return buffer.nbytes
 
-    return True, None
+    position = file.tell()
+    size = file.seek(0, os.SEEK_END)
+    file.seek(position)
+    return size
 
 
 def validate_content(content, length=250):
@@ -129,29 +198,83 @@ def validate_content(content, length=250):
     Returns:
         tuple: (is_valid (bool), error_message (str|None))
     """
-    if not content or content.strip() == "":
+    if not isinstance(content, str):
         return False, "Content cannot be empty."
 
+    # Cheap length check first, strip only content that fits
     if len(content) > length:
         return False, f"Content exceeds {length} characters."
 
+    if not content.strip():
+        return False, "Content cannot be empty."
+
     return True, None
 
 
+def unique_violation_message(error):
+    """
+    Translate a username/email uniqueness IntegrityError into a user message.
+    Matches on the violated constraint name, never on the error text,
+    which echoes the submitted values.
+    Covers both the field unique indexes and the case-insensitive constraints.
+
+    Args:
+        error (IntegrityError): Error raised when saving a User.
+
+    Returns:
+        str: User-facing error message.
+    """
+    diag = getattr(error.__cause__, "diag", None)
+    constraint = getattr(diag, "constraint_name", None)
+    if constraint is None:
+        # SQLite has no diagnostics, its message ends with the index or column name
+        constraint = str(error).rpartition(" ")[2].strip("'")
+    return UNIQUE_VIOLATION_MESSAGES.get(
+        constraint, "Username or email already in use."
+    )
+
+
 def require_http_methods(methods):
+    methods = frozenset(methods)
+
     def decorator(view_func):
-        def wrapper(request, *args, **kwargs):
-            if request.method not in methods:
-                return JsonResponse(
-                    {"error": f"{request.method} request required."}, status=405
-                )
-            return view_func(request, *args, **kwargs)
+        if iscoroutinefunction(view_func):
+
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                if request.method not in methods:
+                    return method_not_allowed(request, methods)
+                return await view_func(request, *args, **kwargs)
+
+        else:
+
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                if request.method not in methods:
+                    return method_not_allowed(request, methods)
+                return view_func(request, *args, **kwargs)
 
         return wrapper
 
     return decorator
 
 
+def method_not_allowed(request, methods):
+    """
+    Return a 405 with the Allow header set and the JSON error the frontend reads.
+    """
+    return HttpResponseNotAllowed(
+        sorted(methods),
+        content=method_not_allowed_body(request.method),
+        content_type="application/json",
+    )
+
+
+@lru_cache(maxsize=16)
+def method_not_allowed_body(method):
+    return orjson.dumps({"error": f"{method} request required."})
+
+
 require_get = require_http_methods(["GET"])
 require_post = require_http_methods(["POST"])
 require_put = require_http_methods(["PUT"])
@@ -162,11 +285,32 @@ class InvalidRequestBodyError(Exception):
     pass
 
 
+class OrjsonResponse(HttpResponse):
+    """
+    JSON response serialized with orjson.
+    Drop-in replacement for JsonResponse, datetimes and UUIDs are encoded natively.
+    """
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=orjson.dumps(data), **kwargs)
+
+
+@lru_cache(maxsize=None)
+def static_url(path):
+    """
+    Resolve a static file URL once, static URLs do not change within a deploy.
+    """
+    return static(path)
+
+
 def default_profile_picture(request):
-    return {"DEFAULT_PROFILE_PICTURE": static(settings.DEFAULT_PROFILE_PICTURE)}
+    return {"DEFAULT_PROFILE_PICTURE": static_url(settings.DEFAULT_PROFILE_PICTURE)}
 
 
 def default_profile_picture_dark(request):
     return {
-        "DEFAULT_PROFILE_PICTURE_DARK": static(settings.DEFAULT_PROFILE_PICTURE_DARK)
+        "DEFAULT_PROFILE_PICTURE_DARK": static_url(
+            settings.DEFAULT_PROFILE_PICTURE_DARK
+        )
     }
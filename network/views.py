@@ -8,13 +8,17 @@ Main application views for the Network project.
 - Designed as entry point for the application.
 """
 
-from django.http import JsonResponse
 from django.contrib.auth import authenticate, login, logout
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.shortcuts import render, redirect
 
 from .models import User
-from .utils import require_post
+from .utils import (
+    get_form_field,
+    require_post,
+    unique_violation_message,
+    OrjsonResponse,
+)
 
 
 def index(request):
@@ -35,14 +39,14 @@ def login_view(request):
         - On success → redirect to index.
         - On failure → re-render login page with an error message.
     """
-    username = request.POST.get("username").strip()
-    password = request.POST.get("password").strip()
+    username = get_form_field(request, "username")
+    password = get_form_field(request, "password")
 
     user = authenticate(request, username=username, password=password)
 
     if user is not None:
         login(request, user)
-        return JsonResponse(
+        return OrjsonResponse(
             {
                 "user_id": user.id,
                 "username": user.username,
@@ -51,7 +55,7 @@ def login_view(request):
             status=200,
         )
 
-    return JsonResponse({"error": "Invalid username and/or password."}, status=400)
+    return OrjsonResponse({"error": "Invalid username and/or password."}, status=400)
 
 
 def logout_view(request):
@@ -59,7 +63,7 @@ def logout_view(request):
     Log the user out and redirect to the index page.
     """
     logout(request)
-    return JsonResponse({"success": True}, status=200)
+    return OrjsonResponse({"success": True}, status=200)
 
 
 @require_post
@@ -75,25 +79,29 @@ def register(request):
     """
     from django.core.exceptions import ValidationError
 
-    username = request.POST.get("username").strip()
-    email = request.POST.get("email").strip().lower()
+    username = get_form_field(request, "username")
+    email = get_form_field(request, "email").lower()
 
     # Add length check to password later
-    password = request.POST.get("password").strip()
-    confirmation = request.POST.get("confirmation").strip()
+    password = get_form_field(request, "password")
+    confirmation = get_form_field(request, "confirmation")
     picture = request.FILES.get("profile_picture")
 
+    if not password:
+        return OrjsonResponse({"error": "Password cannot be empty."}, status=400)
+
     if password != confirmation:
-        return JsonResponse({"error": "Passwords must match."}, status=409)
+        return OrjsonResponse({"error": "Passwords must match."}, status=409)
 
-    # Validate user data
+    # Validate user data, uniqueness is left to the database constraints
     try:
         user = User(username=username, email=email, profile_picture=picture)
         user.set_password(password)
-        user.full_clean()
-        user.save()
+        user.full_clean(validate_unique=False, validate_constraints=False)
+        with transaction.atomic():
+            user.save()
         login(request, user)
-        return JsonResponse(
+        return OrjsonResponse(
             {
                 "user_id": user.id,
                 "username": user.username,
@@ -104,7 +112,7 @@ def register(request):
     except ValidationError as error:
         field = next(iter(error.message_dict))
         message = error.message_dict[field][0]
-        return JsonResponse({"error": message}, status=409)
+        return OrjsonResponse({"error": message}, status=409)
     except IntegrityError as error:
-        error_message = str(error).lower()
-        return JsonResponse({"error": error_message}, status=409)
+        user.discard_unsaved_picture()
+        return OrjsonResponse({"error": unique_violation_message(error)}, status=409)
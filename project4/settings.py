@@ -28,6 +28,14 @@ is_local_dev = os.environ.get("IS_LOCAL_DEV") == "True"
 if is_local_dev and db_config.get("HOST") == "db":
     db_config["HOST"] = "localhost"
 
+# Behind PgBouncer in transaction mode, the bouncer keeps the server connections,
+# so Django opens one per request and cannot rely on server-side cursors.
+if os.environ.get("USE_PGBOUNCER") == "True":
+    db_config["HOST"] = os.environ.get("PGBOUNCER_HOST", "pgbouncer")
+    db_config["PORT"] = os.environ.get("PGBOUNCER_PORT", "6432")
+    db_config["CONN_MAX_AGE"] = 0
+    db_config["DISABLE_SERVER_SIDE_CURSORS"] = True
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.0/howto/deployment/checklist/
 
@@ -128,6 +136,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "project4.wsgi.application"
+ASGI_APPLICATION = "project4.asgi.application"
+
+# Route read-only endpoints to their async views, only useful under an ASGI server
+USE_ASYNC_VIEWS = os.environ.get("USE_ASYNC_VIEWS", "False") == "True"
 
 
 # Database
@@ -135,6 +147,23 @@ WSGI_APPLICATION = "project4.wsgi.application"
 
 DATABASES = {"default": db_config}
 
+# Cache (hot profiles), shared through Redis when REDIS_URL is set
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 
 AUTH_USER_MODEL = "network.User"
 
@@ -180,15 +209,29 @@ STATICFILES_DIRS = [
     BASE_DIR / "network" / "static",
 ]
 
-if DEBUG:
-    STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
-else:  
-    STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        )
+    },
+}
 
 # Media Files (Profile Pictures)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Thumbnails are generated on upload (see network.models), never per request
+VERSATILEIMAGEFIELD_SETTINGS = {
+    "create_images_on_demand": False,
+}
+
+# Pillow refuses to decode larger images (decompression bomb guard)
+MAX_IMAGE_PIXELS = 25_000_000
+
 
 SECURE_BROWSER_NO_OPEN = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -207,4 +250,15 @@ if "test" in sys.argv or "pytest" in sys.modules:
         raise ImproperlyConfigured(
             "DATABASE_URL not found. Create a .env.local file with DATABASE_URL=postgres://... "
             "or run tests with docker compose -f docker-compose.yml exec web pytest"
-        )
\ No newline at end of file
+        )
+
+    # Uploads and generated thumbnails stay in memory, off the disk
+    STORAGES = {
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+
+    # PBKDF2 is deliberately slow, tests only need passwords to round-trip
+    PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
@@ -1,5 +1,7 @@
-from django.test import TestCase
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.hashers import make_password
 from network.models import Post
 from datetime import datetime, timedelta, timezone
 
@@ -8,23 +10,44 @@ User = get_user_model()
 BASE_TIMESTAMP = datetime(2025, 11, 30, 12, 0, 0, tzinfo=timezone.utc)
 
 class BaseNetworkTest(TestCase):
+    rf = RequestFactory()
+    async_rf = AsyncRequestFactory()
+
+    def async_get(self, user=None, **params):
+        """
+        An async GET request for calling async views directly, with auser
+        resolving to user (anonymous by default).
+        """
+        request = self.async_rf.get("/", params)
+        user = AnonymousUser() if user is None else user
+
+        async def auser():
+            return user
+
+        request.auser = auser
+        return request
 
     @classmethod
     def setUpTestData(cls):
         # Create two users
-        cls.user1 = User.objects.create_user(username="alice", email="alice@example.com", password="test123")
-        cls.user2 = User.objects.create_user(username="bob",   email="bob@example.com",   password="test123")
+        password = make_password("test123")
+        cls.user1, cls.user2 = User.objects.bulk_create([
+            User(username="alice", email="alice@example.com", password=password),
+            User(username="bob",   email="bob@example.com",   password=password),
+        ])
 
         # Create 30 posts
-        for i in range(30):
-            Post.objects.create(
+        Post.objects.bulk_create([
+            Post(
                 user=cls.user1,
                 content=f"Post {i+1}",
                 timestamp= BASE_TIMESTAMP - timedelta(seconds=i)
             )
+            for i in range(30)
+        ])
 
         # Cursors
-        all_posts = Post.objects.order_by("-timestamp", "-id")
+        all_posts = list(Post.objects.order_by("-timestamp", "-id").only("id", "timestamp"))
         cls.first_post = all_posts[0]
         cls.first_page_last_post = all_posts[9]   # 10th post (0-indexed)
         cls.second_page_last_post = all_posts[19]
@@ -32,12 +55,19 @@ class BaseNetworkTest(TestCase):
 
     def setUp(self):
         self.client.force_login(self.user1)
-        self.user1 = User.objects.get(pk=self.user1.pk)
-        self.user2 = User.objects.get(pk=self.user2.pk)
+        users = User.objects.in_bulk([self.user1.pk, self.user2.pk])
+        self.user1 = users[self.user1.pk]
+        self.user2 = users[self.user2.pk]
 
         # Cursors
         cls = self.__class__
-        self.first_post = Post.objects.get(id=cls.first_post.id)
-        self.first_page_last_post = Post.objects.get(id=cls.first_page_last_post.id)
-        self.second_page_last_post = Post.objects.get(id=cls.second_page_last_post.id)
-        self.last_post = Post.objects.get(id=cls.last_post.id)
+        posts = Post.objects.in_bulk([
+            cls.first_post.id,
+            cls.first_page_last_post.id,
+            cls.second_page_last_post.id,
+            cls.last_post.id,
+        ])
+        self.first_post = posts[cls.first_post.id]
+        self.first_page_last_post = posts[cls.first_page_last_post.id]
+        self.second_page_last_post = posts[cls.second_page_last_post.id]
+        self.last_post = posts[cls.last_post.id]
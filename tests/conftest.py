@@ -0,0 +1,45 @@
+import pytest
+from django.core.cache import cache
+from uuid import uuid4
+
+from network.models import User
+
+
+@pytest.fixture(autouse=True)
+def run_background_tasks_inline(monkeypatch):
+    """
+    Run background work (profile picture processing) inline,
+    so tests never race a worker thread for the database.
+    """
+    monkeypatch.setattr(
+        "network.models.run_in_background", lambda func, *args: func(*args)
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Start every test with an empty cache, cached profiles outlive test transactions.
+    """
+    cache.clear()
+
+
+@pytest.fixture
+def fake_storage_exists(monkeypatch):
+    """
+    Make default_storage.exists answer from a flag, True unless a test flips it.
+    """
+    flag = {"exists": True}
+    monkeypatch.setattr(
+        "network.models.default_storage.exists", lambda name: flag["exists"]
+    )
+    return flag
+
+
+@pytest.fixture
+def fresh_user(db):
+    """
+    A bare user with a unique username and email.
+    """
+    name = f"u{uuid4().hex[:6]}"
+    return User.objects.create(username=name, email=f"{name}@test.com")
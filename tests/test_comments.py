@@ -1,5 +1,6 @@
 import json
 from django.urls import reverse
+from network.comments import comments_view_async
 from network.models import Comment, Post, User
 from base import BaseNetworkTest
 
@@ -37,6 +38,32 @@ class TestComments(BaseNetworkTest):
         self.assertEqual(response.status_code, 200)
         self.assertIn("comments", response.json())
 
+    def test_get_comments_single_query_for_authors(self):
+        for i in range(3):
+            Comment.objects.create(user=self.user2, post=self.first_post, content=f"{i}")
+        Comment.objects.create(user=self.user1, post=self.first_post, content="mine")
+
+        url = reverse("comments", kwargs={"post_id": self.first_post.id})
+
+        # Session + auth user + comments with their authors joined
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["comments"]), 4)
+
+    async def test_get_comments_async(self):
+        await Comment.objects.acreate(user=self.user2, post=self.first_post, content="async")
+
+        request = self.async_get(self.user1)
+
+        response = await comments_view_async(request, self.first_post.id)
+
+        self.assertEqual(response.status_code, 200)
+        comments = json.loads(response.content)["comments"]
+        self.assertEqual([c["content"] for c in comments], ["async"])
+        self.assertFalse(comments[0]["user_is_author"])
+
     def test_create_and_get_comments(self):
         initial_count = self.first_post.comment_count
 
@@ -105,6 +132,7 @@ class TestComments(BaseNetworkTest):
             content_type="application/json"
         )
         self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["commentCount"], base_count + 1)
         comment = response.json()["comment"]
 
         post.refresh_from_db()
@@ -116,6 +144,7 @@ class TestComments(BaseNetworkTest):
             content_type="application/json"
         )
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["commentCount"], base_count)
 
         post.refresh_from_db()
         self.assertEqual(post.comment_count, base_count)
@@ -1,6 +1,8 @@
 from django.urls import reverse
-from network.models import Post
-import json
+from unittest.mock import patch, PropertyMock
+from network.models import Post, User
+from network.posts import get_more_posts_async, posts_view_async
+import json, orjson
 from base import BaseNetworkTest
 
 class TestPosts(BaseNetworkTest):
@@ -64,13 +66,15 @@ class TestPosts(BaseNetworkTest):
             "post_id": self.last_post.id
         })
         self.assertEqual(final.status_code, 204)
+        self.assertEqual(final.content, b"")
 
     def test_like_and_unlike_post(self):
         post = Post.objects.create(user=self.user1, content="Like test")
         base_count = post.like_count
 
-        self.client.put(reverse("update_post", kwargs={"post_id": post.id}),
+        res = self.client.put(reverse("update_post", kwargs={"post_id": post.id}),
                         json.dumps({"action": "like"}), content_type="application/json")
+        self.assertEqual(res.json()["like_count"], base_count + 1)
         post.refresh_from_db()
         self.assertEqual(post.like_count, base_count + 1)
 
@@ -79,6 +83,82 @@ class TestPosts(BaseNetworkTest):
         post.refresh_from_db()
         self.assertEqual(post.like_count, base_count)
 
+    def test_posts_view_marks_liked_posts(self):
+        self.first_post.like_post(self.user1)
+
+        response = self.client.get(reverse("posts", kwargs={"filter": "all"}))
+        self.assertEqual(response.status_code, 200)
+        posts = response.json()["posts"]
+
+        self.assertTrue(posts[0]["liked"])
+        self.assertFalse(any(post["liked"] for post in posts[1:]))
+
+    def test_posts_view_matches_post_serialize(self):
+        self.first_post.like_post(self.user1)
+
+        response = self.client.get(reverse("posts", kwargs={"filter": "all"}))
+        first = response.json()["posts"][0]
+
+        expected = self.first_post.serialize(self.user1)
+        expected["liked"] = True
+        self.assertEqual(first, orjson.loads(orjson.dumps(expected)))
+
+    def test_posts_view_serves_original_picture_while_processing(self):
+        User.objects.filter(pk=self.first_post.user_id).update(
+            profile_picture="profile_pictures/avatar.png",
+            profile_picture_processing=True,
+        )
+        author = User.objects.get(pk=self.first_post.user_id)
+
+        response = self.client.get(reverse("posts", kwargs={"filter": "all"}))
+        first = response.json()["posts"][0]
+
+        self.assertEqual(first["profile_picture"], author.profile_picture.url)
+        self.assertEqual(first["profile_picture"], author.profile_thumbnail_url)
+
+    @patch("network.models.User.profile_thumbnail_url", new_callable=PropertyMock)
+    def test_posts_view_resolves_thumbnail_once_per_author(self, mock_thumb):
+        mock_thumb.return_value = "/media/thumb.png"
+
+        response = self.client.get(reverse("posts", kwargs={"filter": "all"}))
+
+        self.assertEqual(len(response.json()["posts"]), 10)
+        mock_thumb.assert_called_once()
+
+    async def test_posts_view_async(self):
+        await Post.likes.through.objects.acreate(post_id=self.first_post.id, user_id=self.user1.id)
+
+        response = await posts_view_async(self.async_get(self.user1), "all")
+        self.assertEqual(response.status_code, 200)
+        data = orjson.loads(response.content)
+        self.assertEqual(len(data["posts"]), 10)
+        self.assertTrue(data["posts"][0]["liked"])
+        self.assertTrue(data["hasNext"])
+
+        last = data["posts"][-1]
+        request = self.async_get(self.user1, timestamp=last["timestamp"], post_id=last["id"])
+        response = await get_more_posts_async(request, "all")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(last["id"], [post["id"] for post in orjson.loads(response.content)["posts"]])
+
+        request = self.async_get(self.user1, timestamp="bad", post_id="1")
+        response = await get_more_posts_async(request, "all")
+        self.assertEqual(response.status_code, 400)
+
+    async def test_posts_view_async_profile_filter(self):
+        owner = await User.objects.acreate(username="noposts", email="noposts@test.com")
+
+        response = await posts_view_async(self.async_get(user_id=owner.id), "profile")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(orjson.loads(response.content)["posts"], [])
+
+        request = self.async_get(user_id=99999)
+        self.assertEqual((await posts_view_async(request, "profile")).status_code, 404)
+        self.assertEqual((await get_more_posts_async(request, "profile")).status_code, 404)
+
+        request = self.async_get(user_id=owner.id)
+        self.assertEqual((await get_more_posts_async(request, "profile")).status_code, 204)
+
     def test_cannot_edit_others_post(self):
         post = Post.objects.create(user=self.user2, content="post")
         Post.objects.create(user=self.user2, content="post")
@@ -131,6 +211,21 @@ class TestPosts(BaseNetworkTest):
         self.assertEqual(response.status_code, 404)
         self.assertIn("User not found", response.json()["error"])
 
+        response = self.client.get(
+            reverse("get_more_posts", kwargs={"filter": "profile"}),
+            {"user_id": 99999}
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+    def test_posts_profile_filter_invalid_user_id(self):
+        response = self.client.get(
+            reverse("posts", kwargs={"filter": "profile"}),
+            {"user_id": "abc"}
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("User not found", response.json()["error"])
+
 
     def test_posts_view_no_posts_returns_empty(self):
         Post.objects.all().delete() 
@@ -152,6 +247,13 @@ class TestPosts(BaseNetworkTest):
             {"timestamp": "data-que-nao-existe", "post_id": "abc"}
         )
         self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Error parsing post data.")
+
+        response = self.client.get(
+            reverse("get_more_posts", kwargs={"filter": "all"}),
+            {"timestamp": "data-que-nao-existe", "post_id": self.first_post.id}
+        )
+        self.assertEqual(response.status_code, 400)
 
     def test_create_post_missing_content(self):
         response = self.client.post(
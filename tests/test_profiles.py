@@ -1,67 +1,144 @@
 from django.urls import reverse
+from functools import lru_cache
 from django.core.exceptions import ValidationError
 from django.core.files.storage import FileSystemStorage
 from django.core.files.uploadedfile import SimpleUploadedFile
-from unittest.mock import patch, PropertyMock, Mock
+from django.core.management import call_command
+from io import BytesIO, StringIO
+from PIL import Image
+from unittest.mock import patch, Mock
 from base import BaseNetworkTest
 from versatileimagefield.fields import VersatileImageFieldFile
-from network.models import User
+from versatileimagefield.image_warmer import VersatileImageFieldWarmer
+from network.models import User, process_profile_picture
+from network.profiles import get_email, profile_view_async
+
+import asyncio, base64, orjson, os, pytest
+
+_EDIT_URL = reverse("edit_profile")
+
+
+@lru_cache(maxsize=None)
+def _profile_url(user_id):
+    return reverse("profile", kwargs={"id": user_id})
+
+
+@lru_cache(maxsize=None)
+def _follow_url(user_id):
+    return reverse("follow", kwargs={"id": user_id})
+
+
+@lru_cache(maxsize=None)
+def _email_url(user_id):
+    return reverse("get_email", kwargs={"user_id": user_id})
 
-import base64, pytest
 
 MINIMAL_PNG = base64.b64decode(
     b'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII='
 )
 
+
+def minimal_png_upload(name="avatar.png"):
+    """
+    A fresh upload wrapping the shared MINIMAL_PNG bytes, without copying them.
+    """
+    return SimpleUploadedFile(name, MINIMAL_PNG, content_type="image/png")
+
+
+def _png_bytes():
+    """
+    A decodable PNG, for tests that generate the thumbnail.
+    """
+    buffer = BytesIO()
+    Image.new("RGB", (200, 200)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
 class TestProfile(BaseNetworkTest):
 
     def test_profile_view(self):
-        url = reverse("profile", kwargs={"id": self.user2.id})
+        url = _profile_url(self.user2.id)
         r = self.client.get(url)
         self.assertEqual(r.status_code, 200)
         self.assertEqual(r.json()["username"], "bob")
 
-    @patch('network.models.User.profile_thumbnail_url', new_callable=PropertyMock)
-    @patch('network.models.User.profile_picture_url', new_callable=PropertyMock)
-    def test_picture_upload(self, mock_pic, mock_thumb):
-        mock_thumb.return_value = "/media/profile_pics/mocked/100.png"
-        mock_pic.return_value = "/media/profile_pics/mocked/default.png"
+    def test_profile_view_follow_status(self):
+        url = _profile_url(self.user2.id)
+        self.assertFalse(self.client.get(url).json()["follow"])
+
+        self.user1.toggle_follow(self.user2)
+        self.assertTrue(self.client.get(url).json()["follow"])
+
+        self.client.logout()
+        self.assertFalse(self.client.get(url).json()["follow"])
 
-        f = SimpleUploadedFile("avatar.png", MINIMAL_PNG, content_type="image/png")
+    def test_profile_view_cached_until_follow(self):
+        url = _profile_url(self.user2.id)
+        self.assertEqual(self.client.get(url).json()["followers"], 0)
 
-        r = self.client.post(reverse("edit_profile"), {
-            "username": "newname",
-            "email": "new@example.com",
-            "profile_picture": f
-        })
+        # Session + auth user + follow status, the profile comes from the cache
+        with self.assertNumQueries(3):
+            self.client.get(url)
 
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user1.toggle_follow(self.user2)
+
+        data = self.client.get(url).json()
+        self.assertEqual(data["followers"], 1)
+        self.assertTrue(data["follow"])
+
+    async def test_profile_view_async(self):
+        request = self.async_get(self.user1)
+
+        response = await profile_view_async(request, self.user2.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(orjson.loads(response.content)["username"], "bob")
+
+        response = await profile_view_async(request, 987654321)
+        self.assertEqual(response.status_code, 404)
+
+    def follow_counts(self):
+        counts = User.objects.only("following_count", "followers_count").in_bulk(
+            [self.user1.pk, self.user2.pk]
+        )
+        return counts[self.user1.pk].following_count, counts[self.user2.pk].followers_count
+
+    def test_follow(self):
+        r = self.client.put(_follow_url(self.user2.id), content_type="application/json")
         self.assertEqual(r.status_code, 200)
+        data = r.json()
+        self.assertTrue(data["follow"])
+        self.assertEqual(data["followers_count"], 1)
 
-    def test_follow_unfollow(self):
-        url = reverse("follow", kwargs={"id": self.user2.id})
-        
-        # FOLLOW
-        r1 = self.client.put(url, content_type="application/json")
-        self.assertEqual(r1.status_code, 200)
-        self.assertTrue(r1.json()["follow"])
+        # User 1 followed 1 person, user 2 gained 1 follower
+        self.assertEqual(self.follow_counts(), (1, 1))
 
-        self.user1.refresh_from_db()
-        self.user2.refresh_from_db()
-        self.assertEqual(self.user1.following_count, 1) # User 1 followed 1 person
-        self.assertEqual(self.user2.followers_count, 1) # User 2 gained 1 follower
+    def test_unfollow(self):
+        self.user1.toggle_follow(self.user2)
+
+        r = self.client.put(_follow_url(self.user2.id), content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+        data = r.json()
+        self.assertFalse(data["follow"])
+        self.assertEqual(data["followers_count"], 0)
+
+        # User 1 unfollowed, user 2 lost the follower
+        self.assertEqual(self.follow_counts(), (0, 0))
 
-        # UNFOLLOW
-        r2 = self.client.put(url, content_type="application/json")
-        self.assertEqual(r2.status_code, 200)
-        self.assertFalse(r2.json()["follow"])
+    def test_toggle_follow_updates_only_related_counters(self):
+        self.assertTrue(self.user1.toggle_follow(self.user2))
+        self.assertEqual(self.user1.following_count, 1)
+        self.assertEqual(self.user2.followers_count, 1)
 
         self.user1.refresh_from_db()
         self.user2.refresh_from_db()
-        self.assertEqual(self.user1.following_count, 0) # User 1 unfollowed
-        self.assertEqual(self.user2.followers_count, 0) # User 2 lost follower
+        self.assertEqual((self.user1.following_count, self.user1.followers_count), (1, 0))
+        self.assertEqual((self.user2.following_count, self.user2.followers_count), (0, 1))
+
+        self.assertFalse(self.user1.toggle_follow(self.user2))
+        self.assertFalse(self.user2.followers.filter(id=self.user1.id).exists())
 
     def test_self_follow(self):
-        url = reverse("follow", kwargs={"id": self.user1.id})
+        url = _follow_url(self.user1.id)
 
         r = self.client.put(url, content_type="application/json")
         self.assertEqual(r.status_code, 400)
@@ -76,96 +153,89 @@ class TestProfile(BaseNetworkTest):
         self.assertEqual(self.user1.following_count, 0)
 
     def test_follow_incorrect_user(self):
-        url = reverse("follow", kwargs={"id": 987654321})
+        url = _follow_url(987654321)
 
         r = self.client.put(url, content_type="application/json")
         self.assertEqual(r.status_code, 404)
         self.assertIn("error", r.json())
 
     def test_profile_incorrect_user(self):
-        url = reverse("profile", kwargs={"id": 987654321})
+        url = _profile_url(987654321)
 
         r = self.client.get(url)
         self.assertEqual(r.status_code, 404)
         self.assertIn("error", r.json())
 
-    @patch('network.models.User.profile_thumbnail_url', new_callable=PropertyMock)
-    @patch('network.models.User.profile_picture_url', new_callable=PropertyMock)
-    def test_profile_picture_upload_and_thumbnail(self, mock_pic_url, mock_thumb_url):
-        mock_thumb_url.return_value = '/media/profile_pics/mocked/avatar_100x100.png'
-        mock_pic_url.return_value = '/media/profile_pics/mocked/default.png'
-
-        image = SimpleUploadedFile("avatar.png", MINIMAL_PNG, content_type="image/png")
+    def test_profile_picture_upload_and_thumbnail(self):
+        image = SimpleUploadedFile("avatar.png", _png_bytes(), content_type="image/png")
 
-        response = self.client.post(
-            reverse("edit_profile"),
-            {
-                "username": "alice_new",
-                "email": "alice_new@example.com",
-                "profile_picture": image
-            },
-            format="multipart"
-        )
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                _EDIT_URL,
+                {
+                    "username": "alice_new",
+                    "email": "alice_new@example.com",
+                    "profile_picture": image
+                },
+                format="multipart"
+            )
 
         self.assertEqual(response.status_code, 200)
         self.user1.refresh_from_db()
 
-        self.assertTrue(self.user1.profile_picture)
         self.assertTrue(str(self.user1.profile_picture).endswith(".png"))
         self.assertIn("profile_pics", str(self.user1.profile_picture))
 
-        thumb_url = self.user1.profile_thumbnail_url
-        self.assertIn("100x100", thumb_url)
-        
-        # Test fallback
-        old_pic = self.user1.profile_picture
-        old_pic.delete(save=True)
-        self.assertIn("default", self.user1.profile_picture_url)
+        # The original picture is served until the thumbnail is processed
+        self.assertTrue(self.user1.profile_picture_processing)
+        self.assertEqual(response.json()["profile_picture"], self.user1.profile_picture.url)
 
-    def test_profile_picture_fallback(self):
+        for callback in callbacks:
+            callback()
+
+        self.user1.refresh_from_db()
+        thumbnail = self.user1.profile_picture.thumbnail[User.PROFILE_THUMBNAIL_SIZE]
+        self.assertFalse(self.user1.profile_picture_processing)
+        self.assertTrue(self.user1.profile_picture.storage.exists(thumbnail.name))
+        self.assertEqual(self.user1.profile_thumbnail_url, thumbnail.url)
+        self.assertIn("100x100", thumbnail.url)
+
+    def test_profile_picture_url_without_picture(self):
+        self.assertFalse(self.user2.profile_picture)
+        self.assertEqual(self.user2.profile_picture_url, "")
+        self.assertEqual(self.user2.profile_thumbnail_url, "")
+
+        response = self.client.get(_profile_url(self.user2.id))
+        self.assertIsNone(response.json()["profile_picture"])
+
+    def test_profile_picture_url_uses_stored_name(self):
         mock_storage = Mock(spec=FileSystemStorage) 
         mock_storage.exists.return_value = False
-        
-        with patch('network.models.default_storage', new=mock_storage):
-            
+
+        # The field writes through its own storage, record the name without saving
+        field_storage = User._meta.get_field("profile_picture").storage
+
+        with patch('network.models.default_storage', new=mock_storage), \
+             patch.object(field_storage, "_save", return_value="profile_pics/pic.jpg") as mock_save:
+
             self.user1.profile_picture = SimpleUploadedFile("pic.jpg", b"dummy content")
             self.user1.save()
             
-            url = reverse("profile", kwargs={"id": self.user1.id})
+            url = _profile_url(self.user1.id)
             response = self.client.get(url)
             data = response.json()
 
-            self.assertIn("", data["profile_picture"])
-            mock_storage.exists.assert_called_once()
-
-    def test_registration_error_paths(self):
-            # Password Mismatch
-            response_mismatch = self.client.post(reverse("register"), {
-                "username": "charlie",
-                "email": "charlie@example.com",
-                "password": "pass1",
-                "confirmation": "pass2"  # Different from password
-            })
-            
-            self.assertEqual(response_mismatch.status_code, 409)
-            
-            # Duplicate Username 
-            response_duplicate = self.client.post(reverse("register"), {
-                "username": self.user1.username, 
-                "email": "another@example.com",
-                "password": "testpass",
-                "confirmation": "testpass"
-            })
-            
-            self.assertEqual(response_duplicate.status_code, 409)
+            self.assertTrue(data["profile_picture"].endswith("profile_pics/pic.jpg"))
+            mock_save.assert_called_once()
+            mock_storage.exists.assert_not_called()
 
     def test_edit_profile_validation_error_username(self):
         invalid_username = "a" * 151  
 
-        image = SimpleUploadedFile("avatar.png", MINIMAL_PNG, content_type="image/png")
+        image = minimal_png_upload()
 
         response = self.client.post(
-            reverse("edit_profile"),
+            _EDIT_URL,
             data={
                 "username": invalid_username,
                 "email": "valid@email.com",
@@ -183,7 +253,7 @@ class TestProfile(BaseNetworkTest):
 
     def test_edit_profile_validation_error_email(self):
         response = self.client.post(
-            reverse("edit_profile"),
+            _EDIT_URL,
             data={
                 "username": "newname",
                 "email": "email",
@@ -196,9 +266,47 @@ class TestProfile(BaseNetworkTest):
         self.assertIn("email", data["error"].lower() or "valid" in data["error"].lower())
 
 
+    def test_edit_profile_username_already_in_use(self):
+        response = self.client.post(
+            _EDIT_URL,
+            data={"username": "BOB", "email": "alice@example.com"},
+            format="multipart"
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["error"], "Username already in use.")
+
+        self.user1.refresh_from_db()
+        self.assertEqual(self.user1.username, "alice")
+
+
+    def test_edit_profile_duplicate_keeps_existing_picture(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(_EDIT_URL, {"profile_picture": minimal_png_upload()})
+
+        self.user1.refresh_from_db()
+        old_name = self.user1.profile_picture.name
+        storage = self.user1.profile_picture.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                _EDIT_URL,
+                {"username": "BOB", "profile_picture": minimal_png_upload("new.png")},
+            )
+
+        self.assertEqual(response.status_code, 409)
+
+        self.user1.refresh_from_db()
+        self.assertEqual(self.user1.profile_picture.name, old_name)
+        self.assertTrue(storage.exists(old_name))
+
+        # The rejected upload is not left behind either
+        _, files = storage.listdir(os.path.dirname(old_name))
+        self.assertEqual(files, [os.path.basename(old_name)])
+
     def test_edit_profile_success_without_picture(self):
         response = self.client.post(
-            reverse("edit_profile"),
+            _EDIT_URL,
             data={
                 "username": "alice_updated",
                 "email": "alice.updated@example.com",
@@ -215,28 +323,36 @@ class TestProfile(BaseNetworkTest):
 
 
     def test_get_email_unauthorized(self):
-        response = self.client.get(reverse("get_email", kwargs={"user_id": self.user2.id}))
+        request = self.rf.get(_email_url(self.user2.id))
+        request.user = self.user1
+        response = get_email(request, self.user2.id)
         self.assertEqual(response.status_code, 403)
-        self.assertIn("Unauthorized", response.json()["error"])
+        self.assertIn("Unauthorized", orjson.loads(response.content)["error"])
 
 
-    def test_get_email_success(self):
-        url_reverse = reverse("get_email", kwargs={"user_id": self.user1.id})
+    async def test_get_email_success(self):
+        url_reverse = _email_url(self.user1.id)
         self.assertIn(str(self.user1.id), url_reverse)
         self.assertIn("/email", url_reverse)
 
-        response = self.client.get(url_reverse)
+        await self.async_client.aforce_login(self.user1)
+        response, response_js_style = await asyncio.gather(
+            self.async_client.get(url_reverse),
+            self.async_client.get(f"/user/{self.user1.id}/email"),
+        )
+
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.json()["email"], self.user1.email)
+        data = response.json()
+        self.assertEqual(data["email"], self.user1.email)
 
-        response_js_style = self.client.get(f"/user/{self.user1.id}/email")
         self.assertEqual(response_js_style.status_code, 200)
-        self.assertEqual(response_js_style.json()["email"], self.user1.email)
+        data_js_style = response_js_style.json()
+        self.assertEqual(data_js_style["email"], self.user1.email)
 
 
-@pytest.mark.django_db(transaction=True)
-def test_get_profile_picture_url_thumbnail_branch():
-    user = User.objects.create(username="thumb", email="t@test.com")
+@pytest.mark.django_db
+def test_get_profile_picture_url_thumbnail_branch(fresh_user):
+    user = fresh_user
 
      # Assign fake profile picture 
     file = SimpleUploadedFile("pic.png", b"x", content_type="image/png") 
@@ -248,25 +364,18 @@ def test_get_profile_picture_url_thumbnail_branch():
     thumb.url = "/media/thumb_50.png" 
     user.profile_picture.thumbnail = {"50x50": thumb} 
 
-    with patch("network.models.default_storage.exists", return_value=True):
-        url = user.get_profile_picture_url(thumbnail=True, size="50x50")
+    url = user.get_profile_picture_url(thumbnail=True, size="50x50")
     assert url == "/media/__sized__/pic-thumbnail-50x50.png"
 
-@pytest.mark.django_db(transaction=True)
-def test_get_profile_picture_url_main_branch(monkeypatch):
-    user = User.objects.create(username="url", email="u@test.com")
+@pytest.mark.django_db
+def test_get_profile_picture_url_main_branch(monkeypatch, fresh_user):
+    user = fresh_user
 
     # Create a real file
     file = SimpleUploadedFile("main.png", b"abc", content_type="image/png")
     user.profile_picture = file
     user.save()
 
-    # fake file exists
-    monkeypatch.setattr(
-        "network.models.default_storage.exists",
-        lambda name: True
-    )
-
     file_class = type(user.profile_picture)
 
     monkeypatch.setattr(
@@ -280,8 +389,116 @@ def test_get_profile_picture_url_main_branch(monkeypatch):
 
     assert url == "/media/profile_pics/main.png"
 
-@pytest.mark.django_db(transaction=True)
-def test_delete_previous_picture_signal_throws_error(monkeypatch):
+@pytest.mark.django_db
+def test_get_profile_picture_url_memoized_per_instance():
+    user = User.objects.create(username="memo", email="memo@test.com")
+    user.profile_picture = SimpleUploadedFile("memo.png", b"x", content_type="image/png")
+
+    with patch.object(User, "_resolve_profile_picture_url", return_value="/thumb.png") as mock_resolve:
+        assert user.profile_thumbnail_url == "/thumb.png"
+        assert user.profile_thumbnail_url == "/thumb.png"
+
+    mock_resolve.assert_called_once()
+
+@pytest.mark.django_db
+def test_profile_thumbnail_processed_after_upload(django_capture_on_commit_callbacks):
+    user = User.objects.create(username="warm", email="warm@test.com")
+    thumbnail_size = User.PROFILE_THUMBNAIL_SIZE
+
+    user.profile_picture = SimpleUploadedFile("warm.png", _png_bytes(), content_type="image/png")
+
+    with patch("network.models.run_in_background") as mock_background, \
+            django_capture_on_commit_callbacks(execute=True):
+        user.save()
+
+    mock_background.assert_called_once_with(process_profile_picture, user.pk)
+
+    # Original picture stands in for the thumbnail while processing
+    user.refresh_from_db()
+    assert user.profile_picture_processing
+    assert user.profile_thumbnail_url == user.profile_picture_url
+
+    process_profile_picture(user.pk)
+
+    user.refresh_from_db()
+    thumbnail = user.profile_picture.thumbnail[thumbnail_size]
+    assert not user.profile_picture_processing
+    assert user.profile_picture.storage.exists(thumbnail.name)
+    assert thumbnail_size in user.profile_thumbnail_url
+
+    # Saving without a new picture does not process it again
+    with patch("network.models.run_in_background") as mock_background, \
+            django_capture_on_commit_callbacks(execute=True):
+        user.save()
+    mock_background.assert_not_called()
+
+def _flagged_user(username, content):
+    """
+    A user whose picture upload is committed but not processed yet,
+    on_commit callbacks do not run in the test transaction.
+    """
+    return User.objects.create(
+        username=username,
+        email=f"{username}@test.com",
+        profile_picture=SimpleUploadedFile(f"{username}.png", content, content_type="image/png"),
+    )
+
+@pytest.mark.django_db
+def test_stale_user_save_keeps_processing_flag():
+    user = _flagged_user("stale", _png_bytes())
+    stale = User.objects.get(pk=user.pk)
+    assert stale.profile_picture_processing
+
+    assert process_profile_picture(user.pk)
+
+    stale.first_name = "Stale"
+    stale.save()
+
+    user.refresh_from_db()
+    assert user.first_name == "Stale"
+    assert not user.profile_picture_processing
+
+@pytest.mark.django_db
+def test_failed_thumbnail_keeps_processing_flag(caplog):
+    user = _flagged_user("broken", b"not an image")
+
+    assert not process_profile_picture(user.pk)
+
+    user.refresh_from_db()
+    assert user.profile_picture_processing
+    assert user.profile_thumbnail_url == user.profile_picture_url
+    assert f"failed for user {user.pk}" in caplog.text
+
+@pytest.mark.django_db
+def test_process_profile_picture_error_keeps_processing_flag(caplog):
+    user = _flagged_user("raises", _png_bytes())
+
+    with patch.object(VersatileImageFieldWarmer, "warm", side_effect=OSError), \
+            pytest.raises(OSError):
+        process_profile_picture(user.pk)
+
+    user.refresh_from_db()
+    assert user.profile_picture_processing
+    assert f"failed for user {user.pk}" in caplog.text
+
+@pytest.mark.django_db
+def test_warm_profile_pictures_command():
+    user = _flagged_user("pending", _png_bytes())
+    cleared = User.objects.create(username="cleared", email="cleared@test.com")
+    User.objects.filter(pk=cleared.pk).update(profile_picture_processing=True)
+    out = StringIO()
+
+    call_command("warm_profile_pictures", stdout=out)
+
+    assert "Processed 2 of 2" in out.getvalue()
+    assert not User.objects.filter(profile_picture_processing=True).exists()
+    user.refresh_from_db()
+    assert user.profile_picture.storage.exists(
+        user.profile_picture.thumbnail[User.PROFILE_THUMBNAIL_SIZE].name
+    )
+
+@pytest.mark.django_db
+def test_delete_previous_picture_signal_throws_error(monkeypatch, django_capture_on_commit_callbacks):
     old_file = SimpleUploadedFile("old.png", b"aaa")
     user = User.objects.create(
         username="p", email="p@test.com", profile_picture=old_file
@@ -290,19 +507,21 @@ def test_delete_previous_picture_signal_throws_error(monkeypatch):
 
     new_file = SimpleUploadedFile("new.png", b"bbb")
 
-    with patch.object(VersatileImageFieldFile, "delete", autospec=True) as mock_delete:
+    with patch.object(VersatileImageFieldFile, "delete", autospec=True) as mock_delete, \
+         patch("network.models.run_in_background"):
         mock_delete.side_effect = PermissionError
 
-        user.profile_picture = new_file
-        user.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            user.profile_picture = new_file
+            user.save()
 
         mock_delete.assert_called_once()
 
         user.refresh_from_db()
         assert user.profile_picture.name != old_picture_path
 
-@pytest.mark.django_db(transaction=True)
-def test_delete_previous_picture_signal_deletes_old_image(monkeypatch):
+@pytest.mark.django_db
+def test_delete_previous_picture_signal_deletes_old_image(monkeypatch, django_capture_on_commit_callbacks):
     # Create initial user with profile pic
     old_file = SimpleUploadedFile("old.png", b"aaa")
     user = User.objects.create(
@@ -313,23 +532,27 @@ def test_delete_previous_picture_signal_deletes_old_image(monkeypatch):
     new_file = SimpleUploadedFile("new.png", b"bbb")
 
     with patch.object(VersatileImageFieldFile, "delete", autospec=True) as mock_delete, \
-            patch.object(VersatileImageFieldFile, "delete_all_created_images", autospec=True) as mock_delete_all:
+            patch.object(VersatileImageFieldFile, "delete_all_created_images", autospec=True) as mock_delete_all, \
+            patch("network.models.run_in_background"):
 
-            user.profile_picture = new_file
-            user.save()
+            with django_capture_on_commit_callbacks(execute=True):
+                user.profile_picture = new_file
+                user.save()
+
+                # The old file outlives the save until it commits
+                mock_delete.assert_not_called()
 
             mock_delete_all.assert_called_once()
             mock_delete.assert_called_once()
 
-@pytest.mark.django_db(transaction=True)
-def test_clean_invalid_profile_picture_raises():
+@pytest.mark.django_db
+def test_clean_invalid_profile_picture_raises(fake_storage_exists):
     user = User.objects.create(username="img", email="img@test.com")
 
     file = SimpleUploadedFile("bad.png", b"x", content_type="image/png")
     user.profile_picture = file
 
-    with patch("network.models.default_storage.exists", return_value=True), \
-         patch("network.utils.validate_image", return_value=(False, "Bad image")):
+    with patch("network.utils.validate_image", return_value=(False, "Bad image")):
 
         with pytest.raises(ValidationError) as exc:
             user.full_clean()
@@ -1,17 +1,40 @@
 from io import BytesIO
 from PIL import Image
 from django.http import HttpRequest
-from django.test import TestCase
+from django.core.exceptions import RequestDataTooBig
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
-from unittest.mock import patch
-from network.utils import require_post, get_user, validate_content, validate_image, get_body_content, InvalidRequestBodyError
+from functools import lru_cache
+from unittest.mock import Mock, patch
+from network.utils import default_profile_picture, static_url, require_post, get_user, validate_content, validate_image, get_body_content, unique_violation_message, InvalidRequestBodyError
 from network.models import Post, User
-from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+import json, orjson, pytest
+
+_CREATE_POST_URL = reverse("create_post")
+
+
+@lru_cache(maxsize=None)
+def _create_comment_url(post_id):
+    return reverse("create_comment", kwargs={"post_id": post_id})
 
-import json, pytest
 
 class TestImageValidation:
 
+    @classmethod
+    def setup_class(cls):
+        # Encode the sample images once for the whole class
+        img = Image.new("RGB", (10, 10))
+
+        png = BytesIO()
+        img.save(png, format="PNG")
+        cls.png_bytes = png.getvalue()
+
+        gif = BytesIO()
+        img.save(gif, format="GIF")
+        cls.gif_bytes = gif.getvalue()
+
     def test_invalid_image(self):
         fake = BytesIO(b"xxxxx")
         valid, error = validate_image(fake)
@@ -19,44 +42,63 @@ class TestImageValidation:
         assert error == "Invalid image file."
 
     def test_unsupported_format(self):
-        img = Image.new("RGB", (10, 10))
-        buffer = BytesIO()
-        img.save(buffer, format="GIF")
-        buffer.seek(0)
+        buffer = BytesIO(self.gif_bytes)
 
         valid, error = validate_image(buffer)
         assert not valid
         assert "Unsupported" in error
 
-    def test_too_big(self):
-        img = Image.new("RGB", (10, 10))
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
+    def test_too_big(self, monkeypatch):
+        buffer = BytesIO(self.png_bytes)
+
+        # Shrink the limit instead of allocating an oversized buffer
+        monkeypatch.setattr("network.utils.MAX_IMAGE_SIZE", 1)
 
-        with patch.object(buffer, "getvalue", return_value=b"x" * (6*1024*1024)):
+        with patch.object(buffer, "getvalue") as mock_getvalue, \
+             patch.object(buffer, "read") as mock_read:
             valid, error = validate_image(buffer)
 
+        mock_getvalue.assert_not_called()
+        mock_read.assert_not_called()
+
         assert not valid
         assert error == "Image too big."
 
+    def test_valid_signature_is_not_decoded(self):
+        buffer = BytesIO(b"\xff\xd8\xff\xe0" + b"\x00" * 32)
+
+        with patch("network.utils.Image.open") as mock_open:
+            valid, error = validate_image(buffer)
+
+        assert valid
+        assert error is None
+        mock_open.assert_not_called()
+
     def test_valid_png(self):
-        img = Image.new("RGB", (10, 10))
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
+        buffer = BytesIO(self.png_bytes)
 
         valid, error = validate_image(buffer)
         assert valid
         assert error is None
 
+def test_default_profile_picture_resolved_once():
+    static_url.cache_clear()
+
+    with patch("network.utils.static", return_value="/static/default.png") as mock_static:
+        first = default_profile_picture(HttpRequest())
+        second = default_profile_picture(HttpRequest())
+
+    assert first == second == {"DEFAULT_PROFILE_PICTURE": "/static/default.png"}
+    mock_static.assert_called_once()
+    static_url.cache_clear()
+
 class TestUtilsDatabase(TestCase):
 
-    def setUp(self):
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
+    @classmethod
+    def setUpTestData(cls):
+        cls.user1 = User.objects.create_user(username="test", password="123")
 
-            self.user1 = User.objects.create_user(username="test", password="123")
+    def setUp(self):
             self.client.login(username="test", password="123")
 
     def test_get_user_invalid_id_string(self):
@@ -68,12 +110,28 @@ class TestUtilsDatabase(TestCase):
     def test_get_user_not_found(self):
         assert get_user(999999) is None
 
+    def test_get_user_only_fields(self):
+        user = get_user(str(self.user1.id), "username")
+
+        assert user == self.user1
+        assert "email" in user.get_deferred_fields()
+        assert "username" not in user.get_deferred_fields()
+
     def test_validate_content_exceeds_length(self):
         content = "a" * 260
         valid, error = validate_content(content, length=250)
         assert not valid
         assert "exceeds" in error
 
+    def test_validate_content_rejects_non_string(self):
+        for content in (None, 0, False, [], {"a": 1}):
+            assert validate_content(content) == (False, "Content cannot be empty.")
+
+        response = self.client.post(
+            _CREATE_POST_URL, json.dumps({"content": 0}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_get_body_content_invalid_json(self):
             post = Post.objects.create(user=self.user1, content="Test Post for Comment")
             
@@ -82,7 +140,7 @@ class TestUtilsDatabase(TestCase):
             
             # Use an endpoint that calls get_body_content
             response = self.client.post(
-                reverse("create_comment", kwargs={"post_id": post.id}),
+                _create_comment_url(post.id),
                 malformed_payload,
                 content_type="application/json"
             )
@@ -92,6 +150,12 @@ class TestUtilsDatabase(TestCase):
             response_data = response.json()
             self.assertIn("Invalid JSON in request body", response_data["error"])
 
+    def test_get_body_content_rejects_non_object_json(self):
+        response = self.client.post(_CREATE_POST_URL, "[]", content_type="application/json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid JSON in request body", response.json()["error"])
+
     def test_get_body_content_missing_field(self):
         request = HttpRequest()
         request.method = "POST"
@@ -100,6 +164,26 @@ class TestUtilsDatabase(TestCase):
         with self.assertRaises(InvalidRequestBodyError):
             get_body_content(request, "content")
 
+    def test_get_body_content_parses_once(self):
+        request = HttpRequest()
+        request.method = "PUT"
+        request._body = json.dumps({"action": "edit", "content": " new "}).encode()
+
+        with patch("network.utils.orjson.loads", wraps=orjson.loads) as mock_loads:
+            assert get_body_content(request, "action") == "edit"
+            assert get_body_content(request, "content") == "new"
+
+        mock_loads.assert_called_once()
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=100)
+    def test_get_body_content_enforces_upload_limit(self):
+        request = RequestFactory().put(
+            "/", json.dumps({"content": "a" * 1000}), content_type="application/json"
+        )
+
+        with self.assertRaises(RequestDataTooBig):
+            get_body_content(request, "content")
+
     def test_get_body_content_trim_all_fields(self):
         request = HttpRequest()
         request.method = "POST"
@@ -128,9 +212,18 @@ class TestUtilsDatabase(TestCase):
 
         assert response.status_code == 405
         assert "GET request required." in response.content.decode()
+        assert response["Allow"] == "POST"
+
+    def test_require_http_methods_keeps_view_metadata(self):
+        @require_post
+        def sample_view(request):
+            """Sample docstring."""
+
+        assert sample_view.__name__ == "sample_view"
+        assert sample_view.__doc__ == "Sample docstring."
 
     def test_create_post_empty_content(self):
-            url = reverse("create_post")
+            url = _CREATE_POST_URL
             # Empty string content
             payload = json.dumps({"content": ""}) 
 
@@ -139,13 +232,24 @@ class TestUtilsDatabase(TestCase):
             self.assertEqual(response.status_code, 400) 
 
     @pytest.mark.django_db
-    def test_clean_email_already_in_use(self):
+    def test_email_already_in_use_message(self):
         User.objects.create(username="u1", email="test@example.com")
 
         user2 = User(username="u2", email="TEST@example.com")  # case-insensitive duplicate
 
-        with pytest.raises(ValidationError) as exc:
-            user2.clean()
+        with pytest.raises(IntegrityError) as exc, transaction.atomic():
+            user2.save()
+
+        assert unique_violation_message(exc.value) == "Email already in use."
+
+    def test_unique_violation_message_reads_constraint_name(self):
+        # PostgreSQL reports the constraint on the driver error, the text echoes the values
+        cause = Exception()
+        cause.diag = Mock(constraint_name="network_user_username_key")
+        error = IntegrityError("Key (email)=(email@example.com) already exists.")
+        error.__cause__ = cause
+
+        assert unique_violation_message(error) == "Username already in use."
 
-        assert "email" in exc.value.message_dict
-        assert exc.value.message_dict["email"][0] == "Email already in use."
+        cause.diag.constraint_name = "network_post_pkey"
+        assert unique_violation_message(error) == "Username or email already in use."
@@ -1,21 +1,28 @@
 import pytest
 from django.urls import reverse
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 
 from django.contrib.auth import get_user_model
+from network.views import index, login_view, register
 User = get_user_model()
 
+_INDEX_URL = reverse("index")
+_LOGIN_URL = reverse("login")
+_LOGOUT_URL = reverse("logout")
+_REGISTER_URL = reverse("register")
+
 
 @pytest.mark.django_db
 class TestViews(TestCase):
+    rf = RequestFactory()
 
-    def setUp(self):
-            self.user1 = User.objects.create_user(username="test", password="123")
-            self.client.force_login(self.user1)
+    @classmethod
+    def setUpTestData(cls):
+        cls.user1 = User.objects.create_user(username="test", password="123")
 
     def test_register_password_mismatch(self):
-        response = self.client.post(
-            reverse("register"),
+        request = self.rf.post(
+            _REGISTER_URL,
             {
                 "username": "john",
                 "email": "john@example.com",
@@ -23,52 +30,64 @@ class TestViews(TestCase):
                 "confirmation": "456",
             }
         )
+        response = register(request)
         self.assertEqual(response.status_code, 409)
 
-    def test_registration_error_paths(self):
-            # Password Mismatch
-            response_mismatch = self.client.post(reverse("register"), {
-                "username": "charlie",
-                "email": "charlie@example.com",
-                "password": "pass1",
-                "confirmation": "pass2"  # Different from password
-            })
-            
-            self.assertEqual(response_mismatch.status_code, 409)
-            
-            # Duplicate Username 
-            response_duplicate = self.client.post(reverse("register"), {
-                "username": self.user1.username, 
-                "email": "another@example.com",
-                "password": "testpass",
-                "confirmation": "testpass"
-            })
-            
-            self.assertEqual(response_duplicate.status_code, 409)
-
     def test_index_view_renders(self):
-        response = self.client.get(reverse("index"))
+        request = self.rf.get(_INDEX_URL)
+        request.user = self.user1
+        response = index(request)
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'div class="network-app"')
 
     def test_login_invalid_credentials(self):
+        request = self.rf.post(_LOGIN_URL, {"username": "ghost", "password": "wrong"})
+        response = login_view(request)
+        self.assertEqual(response.status_code, 400)
+        
+
+    def test_login_missing_fields(self):
+        response = self.client.post(_LOGIN_URL, {})
+        self.assertEqual(response.status_code, 400)
+
+    def test_register_missing_password(self):
         response = self.client.post(
-            reverse("login"),
-            {"username": "ghost", "password": "wrong"}
+            _REGISTER_URL,
+            {"username": "john", "email": "john@example.com"}
         )
         self.assertEqual(response.status_code, 400)
-        
 
     def test_login_success(self):
         User.objects.create_user("john", "john@example.com", "123")
 
         response = self.client.post(
-            reverse("login"),
+            _LOGIN_URL,
             {"username": "john", "password": "123"}
         )
 
         self.assertEqual(response.status_code, 200)
 
+@pytest.fixture
+def user1(django_user_model):
+    return django_user_model.objects.create_user(
+        username="existing", email="existing@example.com", password="123"
+    )
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("username,email,password,confirmation", [
+    ("charlie", "charlie@example.com", "pass1", "pass2"),  # Password mismatch
+    ("existing", "another@example.com", "testpass", "testpass"),  # Duplicate username
+])
+def test_registration_errors(client, user1, username, email, password, confirmation):
+    response = client.post(_REGISTER_URL, {
+        "username": username,
+        "email": email,
+        "password": password,
+        "confirmation": confirmation,
+    })
+
+    assert response.status_code == 409
+
 @pytest.mark.django_db
 def test_logout_view(client, django_user_model):
     # Log user in first
@@ -79,7 +98,7 @@ def test_logout_view(client, django_user_model):
 
     assert "_auth_user_id" in client.session  # user is logged in
 
-    response = client.get(reverse("logout"))
+    response = client.get(_LOGOUT_URL)
 
     assert response.status_code == 200
     assert "_auth_user_id" not in client.session  # logged out
@@ -93,7 +112,7 @@ def test_register_success(client):
         "confirmation": "abc12345",
     }
 
-    response = client.post(reverse("register"), data)
+    response = client.post(_REGISTER_URL, data)
 
     assert response.status_code == 200
 
@@ -122,6 +141,6 @@ def test_register_integrity_error(client, monkeypatch):
         "confirmation": "123",
     }
 
-    response = client.post(reverse("register"), data)
+    response = client.post(_REGISTER_URL, data)
 
     assert response.status_code == 409
\ No newline at end of file